@@ -1,8 +1,12 @@
 """Flask application factory and initialization."""
+import os
+
 from flask import Flask, jsonify
+from jinja2 import FileSystemBytecodeCache
 from backend.app.config import Config
 from backend.app.extensions import init_extensions
 from backend.app import db
+from backend.app.cache import TTLCache
 
 
 def create_app(config_class=Config):
@@ -16,6 +20,13 @@ def create_app(config_class=Config):
     """
     app = Flask(__name__)
     app.config.from_object(config_class)
+    try:
+        from backend.app.json_provider import OrjsonProvider
+        app.json = OrjsonProvider(app)
+    except ImportError:
+        # orjson not installed; keep Flask's default JSON provider
+        pass
+    configure_jinja(app)
     # Email validation must be configured explicitly via `app.config['EMAIL_VALIDATION']`.
     # We intentionally do not auto-populate or validate provider keys from environment
     # variables at startup to avoid outbound network calls and noisy logs.
@@ -23,15 +34,14 @@ def create_app(config_class=Config):
     # Initialize Flask extensions
     init_extensions(app)
     
-    # Ensure required database indexes (including unique email/username)
-    try:
-        # Ensure indexes requires app context for current_app access
-        with app.app_context():
-            db.ensure_indexes()
-    except Exception:
-        import logging
-        logging.getLogger(__name__).warning('Could not ensure DB indexes at startup')
+    # Ensure required database indexes (including unique email/username) in
+    # the background so workers start serving without waiting on index builds
+    db.start_index_bootstrap(app)
     
+    # Healthy DB check results are reused for a couple of seconds so frequent
+    # liveness probes don't each cost a ping/serverInfo/listCollections round trip
+    health_cache = TTLCache(maxsize=1, ttl=2)
+
     # Register health check endpoint 
     @app.route('/api/health')
     def health_check():
@@ -44,7 +54,11 @@ def create_app(config_class=Config):
         
         # Database health check
         try:
-            db_health = db.health_check()
+            db_health = health_cache.get('database')
+            if db_health is None:
+                db_health = db.health_check()
+                if db_health.get('status') == 'healthy':
+                    health_cache.set('database', db_health)
             response["database"] = db_health
         except Exception as e:
             response["database"] = {
@@ -78,6 +92,23 @@ def create_app(config_class=Config):
     return app
 
 
+def configure_jinja(app):
+    """Enable the on-disk template bytecode cache when a directory is configured.
+
+    Args:
+        app: Flask application instance
+    """
+    cache_dir = app.config.get('JINJA_BYTECODE_CACHE_DIR')
+    if not cache_dir:
+        return
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache(cache_dir)
+    except OSError as e:
+        import logging
+        logging.getLogger(__name__).warning('Jinja bytecode cache disabled (%s): %s', cache_dir, e)
+
+
 def register_blueprints(app):
     """Register Flask blueprints with the application.
     
@@ -25,7 +25,7 @@ from backend.app.services.auth.reset_password import (
 )
 from backend.app.services.auth.email_validator import validate_email_for_registration
 from backend.app.services.auth.registration_validator import validate_registration_email
-from backend.app.extensions import limiter
+from backend.app.extensions import jwt_blocklist_cache, limiter
 from bson import ObjectId
 
 # Optional: use zxcvbn if installed for a better password strength score
@@ -667,16 +667,22 @@ def logout_access():
     Requires Authorization: Bearer <access_token>
     """
     try:
-        jti = get_jwt().get("jti")
-        sub = get_jwt().get("sub")
-        ttype = get_jwt().get("type", "access")
+        claims = get_jwt()
+        jti = claims.get("jti")
+        sub = claims.get("sub")
+        ttype = claims.get("type", "access")
         database = db_module.get_db()
-        result = database.jwt_blocklist.insert_one({
+        entry = {
             "jti": jti,
             "user_id": sub,
             "token_type": ttype,
             "revokedAt": datetime.now(timezone.utc),
-        })
+        }
+        if claims.get("exp"):
+            # TTL index drops the entry once the token would have expired anyway
+            entry["expiresAt"] = datetime.fromtimestamp(claims["exp"], timezone.utc)
+        result = database.jwt_blocklist.insert_one(entry)
+        jwt_blocklist_cache.pop(jti)
         try:
             logger.info("Revoked access token stored in jwt_blocklist: %s (db=%s)", str(result.inserted_id), current_app.config.get('MONGO_DB'))
         except Exception:
@@ -175,7 +175,8 @@ def get_weekly_forecast():
 			if station_id.isdigit():
 				# try lookup by station_id field in waqi_stations to get its _id
 				try:
-					st_doc = db.waqi_stations.find_one({'station_id': str(station_id)})
+					# station_id is stored as an int (normalize_station_ids.py)
+					st_doc = db.waqi_stations.find_one({'station_id': int(station_id)})
 				except Exception:
 					st_doc = None
 
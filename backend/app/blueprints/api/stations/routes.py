@@ -1,17 +1,25 @@
 """Stations blueprint for managing air quality monitoring stations.
 
 This module implements the stations endpoints. The `/nearest` endpoint is
-implemented inline using a geospatial aggregation (`$geoNear`) and a
-`$lookup` to fetch the latest reading for each station. A legacy fallback
+implemented inline using a geospatial aggregation (`$geoNear`) that reads the
+`latest_reading` embedded on station documents by the ingest job; stations
+without one fall back to a single indexed readings lookup. A legacy fallback
 supports documents that use `geo` or `latitude`/`longitude` fields.
 """
 from flask import Blueprint, request, jsonify, current_app
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime, timezone
 from backend.app.repositories import stations_repo
 import math
+import time
+import hashlib
+import re
+import numpy as np
+from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
 
 from backend.app.extensions import limiter
+from backend.app.cache import TTLCache
 from backend.app import db
 from backend.app.db import DatabaseError
 import traceback
@@ -22,6 +30,59 @@ logger = logging.getLogger(__name__)
 
 stations_bp = Blueprint('stations', __name__)
 
+# Decimal places kept from query coordinates for /nearest (~110 m at the equator)
+_NEAREST_GRID_DECIMALS = 3
+
+# Serialized /nearest bodies keyed by cache key. Entries live for a minute
+# (shorter than the 5-minute Mongo cache) so the reading-freshness check on
+# Mongo cache hits still runs regularly.
+_local_nearest_cache = TTLCache(maxsize=1024, ttl=60)
+
+# Server-side time budget for the /nearest aggregations
+_AGGREGATE_MAX_TIME_MS = 2000
+
+# BSON types that sort after a keyset cursor's own type in an `_id` sort
+# (station _ids are WAQI ints, with ObjectIds left by older imports)
+_KEYSET_LATER_ID_TYPES = {
+    int: ('string', 'object', 'binData', 'objectId', 'bool', 'date', 'timestamp', 'regex'),
+    ObjectId: ('bool', 'date', 'timestamp', 'regex'),
+}
+
+
+class StationListParams(BaseModel):
+    """Query parameters accepted by the station list endpoint."""
+
+    model_config = ConfigDict(extra='ignore')
+
+    limit: int = Field(default=20, gt=0, le=100)
+    offset: int = Field(default=0, ge=0)
+    city: Optional[str] = None
+    country: Optional[str] = None
+    after: Optional[str] = None
+    include_total: bool = False
+
+
+class NearestParams(BaseModel):
+    """Query parameters accepted by /nearest (radius in km)."""
+
+    model_config = ConfigDict(extra='ignore')
+
+    lat: float = Field(ge=-90, le=90)
+    lng: float = Field(ge=-180, le=180)
+    radius: float = Field(default=25.0, gt=0, le=50)
+
+
+def _invalid_params_response(exc: ValidationError):
+    """Build the 400 response for the first validation error in `exc`."""
+    err = exc.errors()[0]
+    field = '.'.join(str(part) for part in err['loc']) or 'query'
+    return jsonify({"error": f"Invalid parameter {field}: {err['msg']}"}), 400
+
+
+def _stations_collection(database):
+    """Return `waqi_stations` with ObjectIds decoded as strings."""
+    return database.get_collection('waqi_stations', codec_options=db.JSON_CODEC_OPTIONS)
+
 
 def _is_signed_int(s: str) -> bool:
     try:
@@ -33,22 +94,48 @@ def _is_signed_int(s: str) -> bool:
         return False
 
 
-def haversine_distance_km(a, b):
-    """Calculate great-circle distance between two (lat, lng) pairs in km."""
+# Mean Earth radius (km) and the epsilon used to round half-up distances
+_EARTH_RADIUS_KM = 6371.0088
+_FMT_EPS = 1e-12
+_KM_PER_DEGREE = _EARTH_RADIUS_KM * math.pi / 180.0
+
+
+def haversine_distance_km(a, b, cos_lat1=None, _rad=math.radians, _sin=math.sin, _cos=math.cos,
+                          _asin=math.asin, _sqrt=math.sqrt, _r=_EARTH_RADIUS_KM):
+    """Calculate great-circle distance between two (lat, lng) pairs in km.
+
+    Pass `cos_lat1` (cosine of the first latitude) when measuring several
+    points from the same origin to skip recomputing it. The math functions
+    are bound as default arguments so they resolve as fast locals.
+    """
     lat1, lon1 = a
     lat2, lon2 = b
-    phi1 = math.radians(lat1)
-    phi2 = math.radians(lat2)
-    dphi = math.radians(lat2 - lat1)
-    dlambda = math.radians(lon2 - lon1)
-    hav = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
-    R = 6371.0088
-    c = 2 * math.asin(min(1, math.sqrt(hav)))
-    return R * c
+    if cos_lat1 is None:
+        cos_lat1 = _cos(_rad(lat1))
+    dphi = _rad(lat2 - lat1)
+    dlambda = _rad(lon2 - lon1)
+    hav = _sin(dphi / 2) ** 2 + cos_lat1 * _cos(_rad(lat2)) * _sin(dlambda / 2) ** 2
+    return _r * 2 * _asin(min(1, _sqrt(hav)))
+
+
+def equirectangular_km_vec(lat0: float, lng0: float, lats, lngs, cos_lat0=None):
+    """Approximate distances (km) from one point to arrays of points.
+
+    Equirectangular ("cheap ruler") projection: one cosine for the query
+    latitude (`cos_lat0`, computed when not given) plus multiplies. Within the
+    50 km search radius it stays within 0.1% of the haversine distance, which
+    is plenty for picking the nearest.
+    """
+    if cos_lat0 is None:
+        cos_lat0 = math.cos(math.radians(lat0))
+    dlng = (lngs - lng0 + 180.0) % 360.0 - 180.0
+    dx = dlng * cos_lat0
+    dy = lats - lat0
+    return _KM_PER_DEGREE * np.hypot(dx, dy)
 
 
 def format_km(value: float) -> float:
-    return round(value + 1e-12, 2)
+    return round(value + _FMT_EPS, 2)
 
 
 def sanitize_for_json(obj):
@@ -64,82 +151,113 @@ def sanitize_for_json(obj):
     return obj
 
 
-def prepare_response(response: dict) -> dict:
-    """Prune debug/internal fields from response unless debug is requested.
+# Subset of a reading document exposed to clients and persisted in the cache
+_LR_KEYS = ('aqi', 'time', 'iaqi', 'meta')
+# Aggregation/debug-only fields that are never served or cached
+_INTERNAL_STATION_KEYS = frozenset(('dist', 'city_geo'))
 
-    - removes `dist` and `city_geo` used for debugging/indexing
-    - trims `latest_reading` to a small useful subset when not debugging
+
+# Fields kept by the nearest `$geoNear` pipelines; the embedded reading is
+# trimmed to the client-facing keys on the server so less data crosses the wire
+_NEAREST_PROJECTION = {
+    'station_id': 1,
+    'name': 1,
+    'country': 1,
+    'city': 1,
+    'location': 1,
+    'dist': 1,
+    **{f'latest_reading.{k}': 1 for k in _LR_KEYS},
+}
+
+
+def _trim_latest_reading(lr: dict):
+    """Return only the client-facing keys of a reading, or None when empty."""
+    return {k: lr[k] for k in _LR_KEYS if k in lr} or None
+
+
+def _clean_station(s: dict, for_cache: bool) -> dict:
+    """Return a JSON-safe copy of a station item in a single pass.
+
+    Drops internal fields, trims `latest_reading` and (for client responses)
+    fills in id/name/location fallbacks.
     """
-    # Always prune internal aggregation/debug fields from responses served to clients
-    if isinstance(response, dict):
-        # support single 'station' or list 'stations'
-        if 'station' in response and isinstance(response['station'], dict):
-            stations_iter = [response['station']]
-            single = True
-        else:
-            stations_iter = response.get('stations') if isinstance(response.get('stations'), list) else []
-            single = False
-
-        for s in stations_iter:
-            if isinstance(s, dict):
-                s.pop('dist', None)
-                s.pop('city_geo', None)
-                # remove nested city.geo when location already present to avoid duplicate coords
-                if isinstance(s.get('city'), dict) and 'geo' in s.get('city', {}):
-                    try:
-                        # if we also have a top-level location, drop the city's geo to avoid duplication
-                        if s.get('location'):
-                            s['city'].pop('geo', None)
-                    except Exception:
-                        s['city'].pop('geo', None)
-                lr = s.get('latest_reading')
-                if isinstance(lr, dict):
-                    trimmed = {k: lr[k] for k in ('aqi', 'time', 'iaqi', 'meta') if k in lr}
-                    s['latest_reading'] = trimmed if trimmed else None
-
-                # Ensure minimal fallbacks so clients always get an id/name when possible
-                if not s.get('station_id') and s.get('_id') is not None:
-                    try:
-                        s['station_id'] = str(s.get('_id'))
-                    except Exception:
-                        s['station_id'] = s.get('_id')
+    item = {}
+    for k, v in s.items():
+        if k in _INTERNAL_STATION_KEYS:
+            continue
+        if k == 'latest_reading' and isinstance(v, dict):
+            v = _trim_latest_reading(v)
+        item[k] = sanitize_for_json(v)
+
+    city = item.get('city')
+    # remove nested city.geo when location already present to avoid duplicate coords
+    if isinstance(city, dict) and 'geo' in city and item.get('location'):
+        city.pop('geo', None)
+
+    if for_cache:
+        return item
+
+    # Ensure minimal fallbacks so clients always get an id/name when possible
+    if not item.get('station_id') and item.get('_id') is not None:
+        item['station_id'] = str(item['_id'])
+    # drop duplicate _id if station_id is present (client-facing id is station_id)
+    if item.get('station_id') and item.get('_id') is not None:
+        item.pop('_id', None)
+    if isinstance(city, dict):
+        if not item.get('name') and city.get('name'):
+            item['name'] = city['name']
+        # ensure location present from city.geo when missing
+        if not item.get('location') and isinstance(city.get('geo'), dict):
+            item['location'] = city['geo']
+    return item
+
+
+def prepare_response(response: dict, for_cache: bool = False) -> dict:
+    """Prune internal fields from a nearest/station response.
 
-                # drop duplicate _id if station_id is present (client-facing id is station_id)
-                if s.get('station_id') and s.get('_id') is not None:
-                    s.pop('_id', None)
+    - removes `dist` and `city_geo` used for debugging/indexing
+    - trims `latest_reading` to a small useful subset
+    - converts ObjectId/datetime values so the result is JSON-safe
 
-                if not s.get('name') and isinstance(s.get('city'), dict):
-                    cname = s['city'].get('name')
-                    if cname:
-                        s['name'] = cname
+    With `for_cache=True` the result is always the single-station shape
+    (`{'station': ...}`) and client-only fallbacks are skipped.
+    """
+    if not isinstance(response, dict):
+        return response
+    # support single 'station' or list 'stations'
+    station = response.get('station')
+    if isinstance(station, dict):
+        stations = [station]
+        single = True
+    else:
+        stations = response.get('stations') if isinstance(response.get('stations'), list) else []
+        single = False
 
-                # ensure location present from city.geo when missing
-                if not s.get('location') and isinstance(s.get('city'), dict):
-                    city_geo = s['city'].get('geo')
-                    if isinstance(city_geo, dict):
-                        s['location'] = city_geo
+    if for_cache:
+        first = next((s for s in stations if isinstance(s, dict)), None)
+        return {'station': _clean_station(first, True) if first is not None else None}
 
-        # if single, ensure response contains 'station' cleaned
-        if single:
-            response['station'] = stations_iter[0]
-    return sanitize_for_json(response)
+    cleaned = {k: sanitize_for_json(v) for k, v in response.items() if k not in ('station', 'stations')}
+    if single:
+        cleaned['station'] = _clean_station(station, False)
+    elif 'stations' in response:
+        cleaned['stations'] = [_clean_station(s, False) if isinstance(s, dict) else sanitize_for_json(s) for s in stations]
+    elif 'station' in response:
+        cleaned['station'] = None
+    return cleaned
 
 
 def _compute_distance_km_from_doc(doc, lat: float, lng: float):
     """Compute an approximate distance in km for a station document.
 
-    Uses the aggregation 'dist' field when present, otherwise falls back to
-    location coordinates and the haversine formula.
+    `$geoNear` results always carry `dist.calculated` (meters), so that is
+    read directly. Documents from plain finds (by-id and meta-idx lookups)
+    have no `dist` and fall back to location coordinates and haversine.
     """
-    dist_field = doc.get('dist', None)
-    dist_m = None
-    if isinstance(dist_field, dict):
-        dist_m = dist_field.get('calculated')
-    elif isinstance(dist_field, (int, float)):
-        dist_m = dist_field
-
-    if isinstance(dist_m, (int, float)):
-        return round(dist_m / 1000.0 + 1e-12, 2)
+    try:
+        return format_km(doc['dist']['calculated'] / 1000.0)
+    except (KeyError, TypeError):
+        pass
 
     loc = doc.get('location') or {}
     coords = loc.get('coordinates') if isinstance(loc, dict) else None
@@ -150,19 +268,72 @@ def _compute_distance_km_from_doc(doc, lat: float, lng: float):
     return None
 
 
-def _cache_response(response: dict, cache_coll, cache_key: str, ttl_seconds: int = 300):
-    """Write `response` to the cache, ensuring debug-only fields are not persisted."""
+def _iter_aggregate(collection, pipeline, batch_size: int):
+    """Yield aggregation results one document at a time.
+
+    Streams from the server cursor instead of materializing the full result
+    list; `batch_size` mirrors the pipeline `$limit` so the first batch holds
+    everything the caller needs. Server time is capped at
+    `_AGGREGATE_MAX_TIME_MS` so a pathological query fails fast instead of
+    tying up the worker.
+    """
+    cursor = collection.aggregate(
+        pipeline,
+        batchSize=batch_size,
+        allowDiskUse=False,
+        maxTimeMS=_AGGREGATE_MAX_TIME_MS,
+    )
     try:
-        expires_at = datetime.utcnow() + timedelta(seconds=ttl_seconds)
-        response_to_cache = _sanitize_for_cache(response)
-        cache_coll.replace_one({"_id": cache_key}, {"_id": cache_key, "response": response_to_cache, "expiresAt": expires_at}, upsert=True)
+        for doc in cursor:
+            yield doc
+    finally:
+        close = getattr(cursor, 'close', None)
+        if close is not None:
+            close()
+
+
+def _conditional_response(body):
+    """Return a JSON `body` with an ETag, answering 304 on If-None-Match.
+
+    The ETag hashes the serialized body, so it changes whenever the nearest
+    station or its latest reading changes; polling clients with a matching
+    tag get an empty 304 instead of the full document.
+    """
+    resp = current_app.response_class(body, mimetype='application/json')
+    resp.set_etag(hashlib.blake2b(resp.get_data(), digest_size=16).hexdigest())
+    return resp.make_conditional(request)
+
+
+def _cache_response(response: dict, cache_coll, cache_key: str, ttl_seconds: int = 300) -> str:
+    """Write `response` to the cache and return its serialized client JSON.
+
+    The cache document keeps the sanitized response (used to check reading
+    freshness on hits) plus the client JSON body, so unchanged hits are served
+    without a decode/prepare/encode round trip. Debug-only fields are never
+    persisted.
+
+    Expiry relies on the `expiresAt` TTL index created once by
+    `db.ensure_indexes()` at startup; no index management happens here.
+    """
+    body = current_app.json.dumps(prepare_response(response))
+    _local_nearest_cache.set(cache_key, body)
+    try:
+        expires_at = datetime.fromtimestamp(time.time() + ttl_seconds, tz=timezone.utc)
+        response_to_cache = prepare_response(response, for_cache=True)
+        cache_coll.replace_one(
+            {"_id": cache_key},
+            {"_id": cache_key, "response": response_to_cache, "response_json": body, "expiresAt": expires_at},
+            upsert=True,
+        )
     except Exception:
         logger.debug("Failed to write nearest cache, continuing")
+    return body
 
 
 def is_debug() -> bool:
     """Return True when debug query param present or app is running in debug mode."""
-    return request.args.get('debug') == '1' or (current_app and getattr(current_app, 'debug', False))
+    # app.debug is a plain attribute; only parse query args when it is off
+    return bool(current_app.debug) or request.args.get('debug') == '1'
 
 
 def extract_coords_from_doc(doc):
@@ -220,54 +391,41 @@ def _extract_latest_from_station_doc(doc):
     return None
 
 
-def get_latest_reading(database, station_id):
-    """Return latest reading document for station_id or None (safe wrapper)."""
+def _id_candidates(raw_id) -> list:
+    """Return the id forms a reading may use for `raw_id` (as stored, int, str)."""
+    if raw_id is None:
+        return []
+    candidates = [raw_id]
     try:
-        if station_id is None:
-            return None
-        return database.waqi_station_readings.find_one({'station_id': station_id}, sort=[('ts', -1)])
-    except Exception:
-        return None
+        candidates.append(int(raw_id))
+    except (TypeError, ValueError):
+        pass
+    candidates.append(str(raw_id))
+    return candidates
 
 
-def _sanitize_for_cache(response: dict) -> dict:
-    """Return a cache-safe copy of response with debug/internal fields removed.
+def get_latest_reading(database, *station_ids):
+    """Return the latest reading matching any of `station_ids` or None (safe wrapper).
 
-    This mirrors `prepare_response` but forces debug_mode=False so cached
-    entries never include debug-only fields and have trimmed latest_reading.
+    Readings may key a station by its string or numeric id (legacy
+    `station_id`) or by the WAQI index in `meta.station_idx`; all candidate
+    forms are batched into a single `$in` query rather than one sequential
+    `find_one` per form.
     """
-    if not isinstance(response, dict):
-        return response
-    cleaned_list = []
-    # handle single station or stations list
-    if 'station' in response and isinstance(response['station'], dict):
-        src = [response['station']]
-    else:
-        src = response.get('stations') if isinstance(response.get('stations'), list) else []
-
-    for s in src:
-        if not isinstance(s, dict):
-            continue
-        item = dict(s)
-        item.pop('dist', None)
-        item.pop('city_geo', None)
-        # remove nested city.geo to avoid storing duplicate coordinates in cache
-        if isinstance(item.get('city'), dict) and 'geo' in item.get('city', {}):
-            try:
-                if item.get('location'):
-                    item['city'].pop('geo', None)
-            except Exception:
-                item['city'].pop('geo', None)
-        lr = item.get('latest_reading')
-        if isinstance(lr, dict):
-            trimmed = {k: lr[k] for k in ('aqi', 'time', 'iaqi', 'meta') if k in lr}
-            item['latest_reading'] = trimmed if trimmed else None
-        cleaned_list.append(item)
-
-    # always return single-station shape for cache
-    if cleaned_list:
-        return {'station': cleaned_list[0]}
-    return {'station': None}
+    ids = [sid for sid in dict.fromkeys(station_ids) if sid is not None]
+    if not ids:
+        return None
+    idx_ids = [sid for sid in ids if isinstance(sid, int)]
+    query = {'station_id': ids[0]} if len(ids) == 1 else {'station_id': {'$in': ids}}
+    if idx_ids:
+        query = {'$or': [query, {'meta.station_idx': {'$in': idx_ids}}]}
+    try:
+        # Served by the (station_id 1, ts -1) and (meta.station_idx 1, ts -1)
+        # indexes from db.ensure_indexes(); keep the sort on `ts` descending so
+        # each $or branch stops at its first index entry.
+        return database.waqi_station_readings.find_one(query, sort=[('ts', -1)])
+    except Exception:
+        return None
 
 
 def _build_station_item(doc: dict, database, lat: float, lng: float) -> dict:
@@ -302,25 +460,8 @@ def _build_station_item(doc: dict, database, lat: float, lng: float) -> dict:
         if doc.get('latest_reading'):
             latest = doc.get('latest_reading')
         else:
-            sid = doc.get('station_id')
-            if sid is not None:
-                latest = database.waqi_station_readings.find_one({'station_id': sid}, sort=[('ts', -1)])
-        # fallback: try numeric document id
-        if not latest:
-            raw_id = doc.get('_id')
-            if raw_id is not None:
-                try:
-                    latest = database.waqi_station_readings.find_one({'station_id': int(raw_id)}, sort=[('ts', -1)])
-                except Exception:
-                    pass
-        # fallback: try stringified id
-        if not latest:
-            raw_id = doc.get('_id')
-            if raw_id is not None:
-                try:
-                    latest = database.waqi_station_readings.find_one({'station_id': str(raw_id)}, sort=[('ts', -1)])
-                except Exception:
-                    pass
+            # station_id plus numeric/stringified document id in one query
+            latest = get_latest_reading(database, doc.get('station_id'), *_id_candidates(doc.get('_id')))
         # fallback: match by exact location coordinates in readings if available
         if not latest:
             loc = doc.get('location')
@@ -387,13 +528,14 @@ def _build_station_item(doc: dict, database, lat: float, lng: float) -> dict:
                 # or by numeric/_id match using the meta index.
                 cand = None
                 try:
-                    cand = database.waqi_stations.find_one({'station_id': str(meta_idx)})
+                    # station_id is stored as an int (normalize_station_ids.py)
+                    cand = _stations_collection(database).find_one({'station_id': int(meta_idx)})
                 except Exception:
                     cand = None
                 if not cand:
                     try:
                         # try numeric _id match
-                        cand = database.waqi_stations.find_one({'_id': int(meta_idx)})
+                        cand = _stations_collection(database).find_one({'_id': int(meta_idx)})
                     except Exception:
                         cand = None
 
@@ -445,32 +587,33 @@ def get_stations():
     Query parameters:
     - limit: Number of items per page (default: 20, max: 100)
     - offset: Number of items to skip (default: 0)
+    - after: Keyset cursor (`next_cursor` of the previous page); replaces offset.
+      Start with no `after` (the first page also returns `next_cursor`), then
+      pass each page's `next_cursor` until it is null.
     - city: Filter by city name
     - country: Filter by country code
+    - include_total: When truthy, also return `total` and `pages` (costs a count)
 
     Returns:
         JSON: List of stations with pagination info
     """
     try:
-        # Parse and validate pagination parameters
-        limit = int(request.args.get('limit', 20))
-        offset = int(request.args.get('offset', 0))
-
-        # Validate limit bounds
-        if limit <= 0:
-            return jsonify({"error": "limit must be greater than 0"}), 400
-        if limit > 100:
-            return jsonify({"error": "limit cannot exceed 100"}), 400
-        if offset < 0:
-            return jsonify({"error": "offset must be non-negative"}), 400
-
-        # Parse filter parameters
-        city = request.args.get('city')
-        country = request.args.get('country')
+        # Parse and validate pagination and filter parameters
+        try:
+            params = StationListParams.model_validate(request.args.to_dict())
+        except ValidationError as e:
+            return _invalid_params_response(e)
+        limit = params.limit
+        offset = params.offset
+        city = params.city
+        country = params.country
 
         # Build filter criteria
         filter_criteria = {}
         if city:
+            # Literal, case-insensitive substring match compiled once per request;
+            # escaping keeps user input from being interpreted as a pattern
+            city_pattern = re.compile(re.escape(city), re.IGNORECASE)
             # If city looks like a signed integer (users sometimes paste station ids
             # into the city search box), support searching by station_id/_id as well
             # so negative indices are matched correctly.
@@ -480,57 +623,80 @@ def get_stations():
                 except Exception:
                     sid_int = None
                 or_clauses = []
-                # match station_id as string
-                or_clauses.append({'station_id': str(city)})
-                # match station_id as numeric (some docs use numeric station_id)
+                # match station_id (stored as an int) or the numeric _id
                 if sid_int is not None:
                     or_clauses.append({'station_id': sid_int})
                     or_clauses.append({'_id': sid_int})
                 # fallback: also match city.name and city.location regex (some station docs
                 # include a human-readable address in city.location). Keep case-insensitive.
-                or_clauses.append({'city.name': {"$regex": city, "$options": "i"}})
-                or_clauses.append({'city.location': {"$regex": city, "$options": "i"}})
+                or_clauses.append({'city.name': city_pattern})
+                or_clauses.append({'city.location': city_pattern})
                 filter_criteria['$or'] = or_clauses
             else:
                 # Match either the city name or the city.location (address) field
                 filter_criteria['$or'] = [
-                    {'city.name': {"$regex": city, "$options": "i"}},
-                    {'city.location': {"$regex": city, "$options": "i"}}
+                    {'city.name': city_pattern},
+                    {'city.location': city_pattern}
                 ]
         if country:
             filter_criteria['country'] = country.upper()
 
+        include_total = params.include_total
+
+        # Pages are always ordered by _id, so any page's last _id is a valid
+        # keyset cursor. With `after`, seek past it instead of skipping
+        # `offset` documents: deep pages cost an index range scan.
+        sort = [('_id', 1)]
+        after = params.after
+        keyset = None
+        if after:
+            # An ObjectId cursor can be all digits, so it is recognised first
+            # (24 hex chars; is_valid alone also accepts any 12-char string)
+            if len(after) == 24 and ObjectId.is_valid(after):
+                after_id = ObjectId(after)
+            elif _is_signed_int(after):
+                after_id = int(after)
+            else:
+                return jsonify({"error": "after must be a station id"}), 400
+            # $gt only matches _ids of the cursor's own type, but the sort
+            # puts every later BSON type after it (numbers < strings < ...
+            # < ObjectId), so those must stay in the page range too
+            keyset = {'$or': [
+                {'_id': {'$gt': after_id}},
+                {'_id': {'$type': list(_KEYSET_LATER_ID_TYPES[type(after_id)])}},
+            ]}
+            offset = 0
+
         # Get stations with pagination from repository
-        stations, total_count = stations_repo.find_with_pagination(
+        stations, total_count, has_next = stations_repo.find_with_pagination(
             filter_dict=filter_criteria,
             limit=limit,
-            offset=offset
+            offset=offset,
+            include_total=include_total,
+            sort=sort,
+            keyset=keyset
         )
 
-        # Convert ObjectId to string for JSON serialization
-        for station in stations:
-            if '_id' in station:
-                station['_id'] = str(station['_id'])
-
         # Calculate pagination metadata
-        total_pages = (total_count + limit - 1) // limit
-        current_page = (offset // limit) + 1
+        pagination = {
+            "limit": limit,
+            "offset": offset,
+            "has_next": has_next,
+            "has_prev": offset > 0 or bool(after)
+        }
+        if not after:
+            # A keyset page has no page number (offset is forced to 0)
+            pagination["current_page"] = (offset // limit) + 1
+        if total_count is not None:
+            pagination["total"] = total_count
+            pagination["pages"] = (total_count + limit - 1) // limit
+        pagination["next_cursor"] = str(stations[-1]['_id']) if has_next else None
 
         return jsonify({
             "stations": stations,
-            "pagination": {
-                "limit": limit,
-                "offset": offset,
-                "total": total_count,
-                "pages": total_pages,
-                "current_page": current_page,
-                "has_next": offset + limit < total_count,
-                "has_prev": offset > 0
-            }
+            "pagination": pagination
         }), 200
 
-    except ValueError as e:
-        return jsonify({"error": f"Invalid parameter: {str(e)}"}), 400
     except Exception as e:
         logger.error(f"Get stations error: {str(e)}")
         return jsonify({"error": "Internal server error"}), 500
@@ -547,36 +713,28 @@ def get_nearest_stations():
     exact-coordinate lookup as a last resort.
     """
     try:
-        # Validate coordinates
-        lat_raw = request.args.get('lat')
-        lng_raw = request.args.get('lng')
-        if lat_raw is None or lng_raw is None:
-            return jsonify({"error": "lat and lng parameters are required"}), 400
-        try:
-            lat = float(lat_raw)
-            lng = float(lng_raw)
-        except (TypeError, ValueError):
-            return jsonify({"error": "lat and lng must be valid numbers"}), 400
-        if not (-90.0 <= lat <= 90.0):
-            return jsonify({"error": "lat out of bounds"}), 400
-        if not (-180.0 <= lng <= 180.0):
-            return jsonify({"error": "lng out of bounds"}), 400
-
-        # radius parameter
+        # Validate coordinates and radius
         try:
-            radius = float(request.args.get('radius', 25.0))
-        except ValueError:
-            return jsonify({"error": "Invalid radius"}), 400
-        if radius <= 0:
-            return jsonify({"error": "radius must be > 0"}), 400
-        if radius > 50:
-            return jsonify({"error": "radius cannot exceed 50 km"}), 400
+            params = NearestParams.model_validate(request.args.to_dict())
+        except ValidationError as e:
+            return _invalid_params_response(e)
+        lat, lng, radius = params.lat, params.lng, params.radius
 
         # For this endpoint we only return the single nearest station
         limit = 1
 
-        # caching key
-        cache_key = f"nearest:{lat:.6f}:{lng:.6f}:{radius:.1f}:{limit}"
+        # Snap the query point to a ~110 m grid before building the cache key
+        # and pipeline, so nearby requests share one cache entry and the cached
+        # distance matches the point it was computed for.
+        lat = round(lat, _NEAREST_GRID_DECIMALS)
+        lng = round(lng, _NEAREST_GRID_DECIMALS)
+        cache_key = f"nearest:{lat:.{_NEAREST_GRID_DECIMALS}f}:{lng:.{_NEAREST_GRID_DECIMALS}f}:{radius:.1f}:{limit}"
+        # Process-local cache first: a warm worker answers hot coordinates
+        # without touching the db module or the Mongo cache
+        local_body = _local_nearest_cache.get(cache_key)
+        if local_body is not None:
+            return _conditional_response(local_body)
+
         # Acquire database and cache collection (handle DB unavailability)
         try:
             database = db.get_db()
@@ -585,8 +743,6 @@ def get_nearest_stations():
             logger.error("Database unavailable for nearest lookup: %s", e)
             return jsonify({"error": "Database unavailable"}), 503
 
-        # Diagnostics removed in production code; responses are always sanitized
-
         # Check cache (if DB reachable)
         cached = cache_coll.find_one({"_id": cache_key})
         if cached:
@@ -606,20 +762,8 @@ def get_nearest_stations():
 
                 if station_obj is not None:
                     # Lookup the latest reading document from readings collection
-                    latest_doc = None
-                    sid = station_obj.get('station_id')
-                    if sid is not None:
-                        try:
-                            latest_doc = database.waqi_station_readings.find_one({'station_id': sid}, sort=[('ts', -1)])
-                        except Exception:
-                            latest_doc = None
-
-                    # fallback: numeric _id
-                    if latest_doc is None and station_obj.get('_id') is not None:
-                        try:
-                            latest_doc = database.waqi_station_readings.find_one({'station_id': int(station_obj.get('_id'))}, sort=[('ts', -1)])
-                        except Exception:
-                            latest_doc = None
+                    # station_id and document id candidates in one query
+                    latest_doc = get_latest_reading(database, station_obj.get('station_id'), *_id_candidates(station_obj.get('_id')))
 
                     # fallback: match by location coordinates
                     if latest_doc is None and isinstance(station_obj.get('location'), dict):
@@ -670,15 +814,15 @@ def get_nearest_stations():
 
                         if need_update:
                             station_obj['latest_reading'] = latest_doc
-                            try:
-                                _cache_response(response, cache_coll, cache_key)
-                            except Exception:
-                                pass
+                            return _conditional_response(_cache_response(response, cache_coll, cache_key))
             except Exception:
                 # ignore enrichment failures and return cached response
                 pass
 
-            return jsonify(prepare_response(response)), 200
+            # Unchanged hit: serve the stored JSON body as-is when present
+            body = cached.get('response_json') or current_app.json.dumps(prepare_response(response))
+            _local_nearest_cache.set(cache_key, body)
+            return _conditional_response(body)
 
         max_meters = int(radius * 1000)
         pipeline = [
@@ -692,68 +836,29 @@ def get_nearest_stations():
                 }
             },
             {'$limit': limit},
-            {
-                '$lookup': {
-                    'from': 'waqi_station_readings',
-                    'let': {'sid': '$station_id'},
-                    'pipeline': [
-                        {'$match': {'$expr': {'$or': [
-                            {'$eq': ['$station_id', '$$sid']},
-                            {'$eq': ['$meta.station_idx', {'$toInt': '$$sid'}]}
-                        ]}}},
-                        {'$sort': {'ts': -1}},
-                        {'$limit': 1}
-                    ],
-                    'as': 'latest_reading'
-                }
-            },
-            {
-                '$project': {
-                    'latest_reading': {'$arrayElemAt': ['$latest_reading', 0]},
-                    'station_id': 1,
-                    'name': 1,
-                    'country': 1,
-                    'city': 1,
-                    'location': 1,
-                    'dist': 1
-                }
-            }
+            {'$project': _NEAREST_PROJECTION}
         ]
 
-        # Run aggregation with a retry for missing geospatial index
+        # The 2dsphere index on `location` is created by db.ensure_indexes() at
+        # startup. If it is still missing (e.g. startup had no primary), fall
+        # through to the city.geo and legacy scans below rather than building
+        # an index inside the request.
+        doc = None
         try:
-            results = list(database.waqi_stations.aggregate(pipeline))
-            # geo aggregation returned N results
+            doc = next(_iter_aggregate(_stations_collection(database), pipeline, limit), None)
         except OperationFailure as e:
             msg = str(e).lower()
-            logger.warning("Aggregation failed with OperationFailure: %s", e)
-            # record geo aggregation error (removed diagnostics for responses)
-            # If failure due to missing geospatial index, try to create indexes and retry once
-            if 'geonear' in msg or 'geo near' in msg or 'unable to find index' in msg or '$geonear' in msg:
-                logger.info("Attempting to create geospatial indexes and retry aggregation")
-                try:
-                    db.ensure_indexes()
-                except Exception as idx_e:
-                    logger.error("Failed to create indexes during geo fallback: %s", idx_e)
-                else:
-                    try:
-                        results = list(database.waqi_stations.aggregate(pipeline))
-                        # geo retry aggregation returned N results
-                    except Exception as retry_e:
-                        logger.exception("Retry after index creation failed: %s", retry_e)
-                        return jsonify({"error": "Internal server error"}), 500
+            if 'geonear' in msg or 'geo near' in msg or 'unable to find index' in msg:
+                logger.warning("geoNear on location unavailable, using fallbacks: %s", e)
             else:
                 logger.exception("Aggregation OperationFailure not related to missing index: %s", e)
                 return jsonify({"error": "Internal server error"}), 500
 
-        # If aggregation returned results, format and return
-        if results:
-            # Only first (nearest) result is needed
-            doc = results[0]
+        # If aggregation returned a result, format and return (only the nearest is needed)
+        if doc is not None:
             station_item = _build_station_item(doc, database, lat, lng)
             response = {"station": station_item}
-            _cache_response(response, cache_coll, cache_key)
-            return jsonify(prepare_response(response)), 200
+            return _conditional_response(_cache_response(response, cache_coll, cache_key))
 
         # Try alternate geo field `city.geo` (some documents keep coordinates there)
         try:
@@ -768,46 +873,17 @@ def get_nearest_stations():
                     }
                 },
                 {'$limit': limit},
-                {
-                    '$lookup': {
-                        'from': 'waqi_station_readings',
-                        'let': {'sid': '$station_id'},
-                        'pipeline': [
-                            {'$match': {'$expr': {'$or': [
-                                {'$eq': ['$station_id', '$$sid']},
-                                {'$eq': ['$meta.station_idx', {'$toInt': '$$sid'}]}
-                            ]}}},
-                            {'$sort': {'ts': -1}},
-                            {'$limit': 1}
-                        ],
-                        'as': 'latest_reading'
-                    }
-                },
-                {
-                    '$project': {
-                        'latest_reading': {'$arrayElemAt': ['$latest_reading', 0]},
-                        'station_id': 1,
-                        'name': 1,
-                        'country': 1,
-                        'city': 1,
-                        'location': 1,
-                        'dist': 1,
-                        'city_geo': '$city.geo'
-                    }
-                }
+                {'$project': {**_NEAREST_PROJECTION, 'city_geo': '$city.geo'}}
             ]
 
-            alt_results = list(database.waqi_stations.aggregate(alt_pipeline))
-            if alt_results:
-                # Normalize docs to include `location` from `city.geo` when missing
-                for doc in alt_results:
-                    if not doc.get('location') and isinstance(doc.get('city_geo'), dict):
-                        doc['location'] = doc.get('city_geo')
-                doc = alt_results[0]
+            doc = next(_iter_aggregate(_stations_collection(database), alt_pipeline, limit), None)
+            if doc is not None:
+                # Normalize doc to include `location` from `city.geo` when missing
+                if not doc.get('location') and isinstance(doc.get('city_geo'), dict):
+                    doc['location'] = doc.get('city_geo')
                 station_item = _build_station_item(doc, database, lat, lng)
                 response = {"station": station_item}
-                _cache_response(response, cache_coll, cache_key)
-                return jsonify(prepare_response(response)), 200
+                return _conditional_response(_cache_response(response, cache_coll, cache_key))
         except OperationFailure as e:
             logger.warning("Alternate geoNear on city.geo failed: %s", e)
             # continue to legacy fallback
@@ -815,7 +891,7 @@ def get_nearest_stations():
         # No results from geo-indexed aggregation: perform legacy fallback
         logger.info("No geo-indexed results; attempting legacy-geo fallback")
         try:
-            cursor = database.waqi_stations.find(
+            cursor = _stations_collection(database).find(
                 {
                     '$or': [
                         {'location.coordinates': {'$exists': True}},
@@ -837,56 +913,49 @@ def get_nearest_stations():
                 }
             )
 
-            candidates = []
+            # Extract coordinates in one pass, then rank every station with a
+            # single vectorized cheap-ruler call and keep the nearest in-radius
+            # one (this endpoint returns one).
+            docs, lats, lngs = [], [], []
             scanned = 0
             for doc in cursor:
                 scanned += 1
-                station_lng = station_lat = None
-                if isinstance(doc.get('location'), dict):
-                    coords = doc['location'].get('coordinates')
-                    if isinstance(coords, list) and len(coords) >= 2:
-                        station_lng, station_lat = coords[0], coords[1]
-                if station_lng is None and isinstance(doc.get('geo'), dict):
-                    coords = doc['geo'].get('coordinates')
-                    if isinstance(coords, list) and len(coords) >= 2:
-                        station_lng, station_lat = coords[0], coords[1]
-                # some documents store coordinates under city.geo per schema
-                if station_lng is None and isinstance(doc.get('city'), dict):
-                    city_geo = doc['city'].get('geo')
-                    if isinstance(city_geo, dict):
-                        coords = city_geo.get('coordinates')
-                        if isinstance(coords, list) and len(coords) >= 2:
-                            station_lng, station_lat = coords[0], coords[1]
-                if station_lng is None and 'latitude' in doc and 'longitude' in doc:
-                    station_lat = doc.get('latitude')
-                    station_lng = doc.get('longitude')
-
-                if station_lat is None or station_lng is None:
-                    continue
-
+                station_lat, station_lng = extract_coords_from_doc(doc)
                 try:
-                    dist_km = haversine_distance_km((lat, lng), (station_lat, station_lng))
-                except Exception:
+                    station_lat, station_lng = float(station_lat), float(station_lng)
+                except (TypeError, ValueError):
                     continue
-
-                if dist_km <= radius:
-                    normalized = {
-                        'station_id': doc.get('station_id'),
-                        'name': doc.get('name'),
-                        'country': doc.get('country'),
-                        'city': doc.get('city'),
-                        'location': {'type': 'Point', 'coordinates': [station_lng, station_lat]},
-                        '_id': str(doc.get('_id')) if doc.get('_id') else None,
-                        '_distance_km': format_km(dist_km)
-                    }
-                    candidates.append((dist_km, doc, normalized))
-
-            logger.debug("Legacy fallback scanned %d documents, found %d candidates", scanned, len(candidates))
-            # legacy scanned/ candidates recorded in logs only
-            logger.debug("Legacy scanned %d candidates", len(candidates))
-
-            candidates.sort(key=lambda x: x[0])
-            selected = candidates[:limit]
+                docs.append(doc)
+                lats.append(station_lat)
+                lngs.append(station_lng)
+
+            # Query-point trig shared by the ranking and exact-distance calls
+            cos_q = math.cos(math.radians(lat))
+            nearest = None
+            if docs:
+                dists = equirectangular_km_vec(lat, lng, np.asarray(lats), np.asarray(lngs), cos_q)
+                dists[~(dists <= radius)] = np.inf
+                i = int(np.argmin(dists))
+                if np.isfinite(dists[i]):
+                    # report the exact great-circle distance for the winner only
+                    dist_km = haversine_distance_km((lat, lng), (lats[i], lngs[i]), cos_q)
+                    nearest = (dist_km, docs[i], lats[i], lngs[i])
+
+            logger.debug("Legacy fallback scanned %d documents, nearest found: %s", scanned, nearest is not None)
+
+            selected = []
+            if nearest is not None:
+                dist_km, doc, station_lat, station_lng = nearest
+                normalized = {
+                    'station_id': doc.get('station_id'),
+                    'name': doc.get('name'),
+                    'country': doc.get('country'),
+                    'city': doc.get('city'),
+                    'location': {'type': 'Point', 'coordinates': [station_lng, station_lat]},
+                    '_id': doc.get('_id'),
+                    '_distance_km': format_km(dist_km)
+                }
+                selected.append((dist_km, doc, normalized))
 
             # Exact-match fallback if still empty
             if not selected:
@@ -899,7 +968,7 @@ def get_nearest_stations():
                     ]
                 }
                 logger.debug('Attempting exact-coordinate lookup with query: %s', exact_q)
-                doc = database.waqi_stations.find_one(exact_q, {'station_id':1, 'name':1, 'country':1, 'city':1, 'geo':1, 'location':1, 'latitude':1, 'longitude':1, '_id':1})
+                doc = _stations_collection(database).find_one(exact_q, {'station_id':1, 'name':1, 'country':1, 'city':1, 'geo':1, 'location':1, 'latitude':1, 'longitude':1, '_id':1})
                 if doc:
                     station_lng = station_lat = None
                     if isinstance(doc.get('location'), dict):
@@ -927,38 +996,20 @@ def get_nearest_stations():
                             'country': doc.get('country'),
                             'city': doc.get('city'),
                             'location': {'type': 'Point', 'coordinates': [station_lng, station_lat]},
-                            '_id': str(doc.get('_id')) if doc.get('_id') else None,
-                            '_distance_km': format_km(haversine_distance_km((lat, lng), (station_lat, station_lng)))
+                            '_id': doc.get('_id'),
+                            '_distance_km': format_km(haversine_distance_km((lat, lng), (station_lat, station_lng), cos_q))
                         }
-                        latest = None
-                        try:
-                            sid = doc.get('station_id')
-                            if sid is not None:
-                                latest = database.waqi_station_readings.find_one({'station_id': sid}, sort=[('ts', -1)])
-                        except Exception:
-                            latest = None
-                        item = normalized.copy()
-                        item['latest_reading'] = latest if latest else None
-                        response = {"station": item}
-                        _cache_response(response, cache_coll, cache_key)
-                        return jsonify(prepare_response(response)), 200
+                        # normalized is freshly built and not shared: attach in place
+                        normalized['latest_reading'] = get_latest_reading(database, doc.get('station_id')) or None
+                        response = {"station": normalized}
+                        return _conditional_response(_cache_response(response, cache_coll, cache_key))
 
             # Build response from selected candidates
             # Use first selected candidate (nearest)
             dist_km, doc, normalized = selected[0]
-            latest = None
-            try:
-                sid = doc.get('station_id')
-                if sid is not None:
-                    latest = database.waqi_station_readings.find_one({'station_id': sid}, sort=[('ts', -1)])
-            except Exception:
-                latest = None
-
-            item = normalized.copy()
-            item['latest_reading'] = latest if latest else None
-            response = {"station": item}
-            _cache_response(response, cache_coll, cache_key)
-            return jsonify(prepare_response(response)), 200
+            normalized['latest_reading'] = get_latest_reading(database, doc.get('station_id')) or None
+            response = {"station": normalized}
+            return _conditional_response(_cache_response(response, cache_coll, cache_key))
 
         except Exception as e:
             logger.exception("Legacy geo fallback failed: %s", e)
@@ -967,7 +1018,7 @@ def get_nearest_stations():
 
     except Exception as e:
         # Log the exception with a short error code to help triage without leaking stack traces to clients
-        error_code = f"NS-{int(datetime.utcnow().timestamp())}"
+        error_code = f"NS-{int(time.time())}"
         logger.exception("Nearest station lookup failed (%s): %s", error_code, e)
         # In development only, include traceback in response to aid debugging
         if current_app and getattr(current_app, 'debug', False):
@@ -1006,16 +1057,16 @@ def get_station_by_meta_idx(meta_idx: int):
     except DatabaseError:
         return jsonify({'error': 'Database unavailable'}), 503
 
-    # Try station_id (string) then numeric _id
+    # Try station_id (stored as an int) then numeric _id
     doc = None
     try:
-        doc = database.waqi_stations.find_one({'station_id': str(meta_idx)})
+        doc = _stations_collection(database).find_one({'station_id': meta_idx})
     except Exception:
         doc = None
 
     if not doc:
         try:
-            doc = database.waqi_stations.find_one({'_id': meta_idx})
+            doc = _stations_collection(database).find_one({'_id': meta_idx})
         except Exception:
             doc = None
 
@@ -1107,13 +1158,7 @@ def get_station(station_id):
             # the raw station document (but ensure _id is JSON-serializable).
             pass
 
-        # Convert ObjectId to string for JSON serialization when returning raw doc
-        if '_id' in station:
-            try:
-                station['_id'] = str(station['_id'])
-            except Exception:
-                pass
-
+        # Repository documents are decoded with string _id values already
         return jsonify(station), 200
 
     except Exception as e:
@@ -1,102 +1,330 @@
 """User Subscriptions API - wrapper around alerts subscriptions with JWT auth."""
 
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from flask_jwt_extended import jwt_required, get_jwt_identity
 from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 from datetime import datetime, timezone, timedelta
+import functools
 import logging
+import sys
 import unicodedata
 import re
 
 from backend.app.repositories import users_repo, readings_repo
 from backend.app import db as db_module
+from backend.app.cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
+# Vietnam time (UTC+7) used for timestamps in API responses
+VN_TZ = timezone(timedelta(hours=7))
+
+
+def _vn_date_string(field):
+    """Aggregation expression rendering a date field as a VN-time ISO string.
+
+    Formatting happens on the server so rows arrive with ready strings, in
+    the same millisecond-precision format `_to_vn_iso` produces.
+    Non-date values (legacy strings) pass through unchanged and missing
+    fields stay missing, as with `_to_vn_iso`.
+    """
+    return {'$cond': [
+        {'$eq': [{'$type': field}, 'date']},
+        {'$dateToString': {'format': '%Y-%m-%dT%H:%M:%S.%L+07:00', 'date': field, 'timezone': '+07:00'}},
+        field,
+    ]}
+
+
+# Fields read when building the subscription listing (including the name
+# candidates consulted by _resolve_station_names)
+_SUBSCRIPTION_LIST_PROJECTION = {
+    'station_id': 1, 'alert_threshold': 1, 'status': 1, 'createdAt': 1,
+    'created_at': _vn_date_string('$createdAt'),
+    'station_name': 1, 'name': 1, 'display_name': 1,
+    'metadata.nickname': 1, 'metadata.label': 1, 'metadata.description': 1,
+}
+_STATION_LIST_PROJECTION = {
+    '_id': 0, 'station_id': 1, 'name': 1, 'displayName': 1, 'station_name': 1,
+    'full_name': 1, 'label': 1, 'description': 1, 'meta': 1, 'location': 1,
+    'city.name': 1, 'latest_reading.aqi': 1,
+    'latest_reading.ts': _vn_date_string('$latest_reading.ts'),
+    'latest_reading.time': 1,
+}
+
+# Projected station documents keyed by station_id. They include the embedded
+# latest AQI, so entries live for a minute (the /nearest local cache uses the
+# same window); station names and locations change far less often.
+_station_cache = TTLCache(maxsize=4096, ttl=60)
+# Latest reading per WAQI station index for stations without an embedded
+# one; readings arrive every few minutes, so popular stations are shared
+# across users. Stations with no reading are cached as {}.
+_reading_cache = TTLCache(maxsize=4096, ttl=45)
+
 _GENERIC_STATION_LABEL_RE = re.compile(r'^\s*(?:TRAM|STATION)(?:[\s\-_/]*)\d+\s*$', re.IGNORECASE)
 
+_INT_RE = re.compile(r'\s*-?\d+\s*')
+
+
+def _as_int(value):
+    """Return `value` as an int if it is an integer (or integer string), else None.
+
+    Checked up front instead of catching int() errors, which also covers
+    JSON objects/lists/bools that int() would reject with TypeError or accept.
+    """
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str) and _INT_RE.fullmatch(value):
+        return int(value)
+    return None
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+@functools.cache
+def _label_translation() -> dict:
+    """Table that drops combining marks left by NFKD and folds đ/Đ (which
+    have no decomposition) in a single str.translate call.
+
+    Built on first use: scanning every code point is too slow for import time.
+    """
+    table = dict.fromkeys(
+        cp for cp in range(sys.maxunicode + 1) if unicodedata.combining(chr(cp))
+    )
+    table.update({ord('đ'): 'd', ord('Đ'): 'D'})
+    return table
+
+
+@functools.lru_cache(maxsize=4096)
 def _normalize_station_label(name: str) -> str:
-    normalized = unicodedata.normalize('NFKD', name)
-    stripped = ''.join(ch for ch in normalized if not unicodedata.combining(ch))
-    collapsed = re.sub(r'\s+', ' ', stripped.replace('đ', 'd').replace('Đ', 'D')).strip()
-    return collapsed.upper()
+    stripped = unicodedata.normalize('NFKD', name).translate(_label_translation())
+    return _WHITESPACE_RE.sub(' ', stripped).strip().upper()
 
 def _is_generic_station_label(name: str) -> bool:
-    if not isinstance(name, str) or not name.strip():
+    if not isinstance(name, str):
         return True
+    name = name.strip()
+    if not name:
+        return True
+    if name.isascii():
+        # NFKD and mark stripping leave ASCII unchanged, so match the raw
+        # text; most real names are rejected on their first letter
+        return name[0] in 'TtSs' and bool(_GENERIC_STATION_LABEL_RE.match(name))
+    return _is_generic_label_text(name)
+
+
+@functools.lru_cache(maxsize=4096)
+def _is_generic_label_text(name: str) -> bool:
+    # Station names repeat across rows and requests; cache the Unicode
+    # normalization + regex result per distinct string
     return bool(_GENERIC_STATION_LABEL_RE.match(_normalize_station_label(name)))
 
 
-def _resolve_station_names(sub, station, station_id_int):
-    metadata = sub.get('metadata') or {}
-    nickname_meta = metadata.get('nickname')
+def _normalize_candidate(value):
+    if isinstance(value, str):
+        value = value.strip()
+        return value or None
+    return None
 
-    def normalize_candidate(value):
-        if isinstance(value, str):
-            value = value.strip()
-            return value or None
-        return None
 
-    def collect_from_mapping(mapping, keys):
-        results = []
-        if isinstance(mapping, dict):
-            for key in keys:
-                val = mapping.get(key)
-                if isinstance(val, dict):
-                    results.extend([
-                        normalize_candidate(val.get('name')),
-                        normalize_candidate(val.get('description')),
-                        normalize_candidate(val.get('label')),
-                    ])
-                else:
-                    results.append(normalize_candidate(val))
-        return [v for v in results if v]
-
-    nickname_meta = normalize_candidate(nickname_meta)
-    if nickname_meta and _is_generic_station_label(nickname_meta):
-        nickname_meta = None
+def _iter_mapping_candidates(mapping, keys):
+    if isinstance(mapping, dict):
+        for key in keys:
+            val = mapping.get(key)
+            if isinstance(val, dict):
+                yield _normalize_candidate(val.get('name'))
+                yield _normalize_candidate(val.get('description'))
+                yield _normalize_candidate(val.get('label'))
+            else:
+                yield _normalize_candidate(val)
 
-    candidates = [
-        nickname_meta,
-        normalize_candidate(sub.get('station_name')),
-        normalize_candidate(sub.get('name')),
-        normalize_candidate(sub.get('display_name')),
-        normalize_candidate(metadata.get('label')),
-        normalize_candidate(metadata.get('description')),
-    ]
+
+def _iter_name_candidates(sub, metadata, nickname_meta, station):
+    """Yield display-name candidates in priority order, computing each lazily."""
+    yield nickname_meta
+    yield _normalize_candidate(sub.get('station_name'))
+    yield _normalize_candidate(sub.get('name'))
+    yield _normalize_candidate(sub.get('display_name'))
+    yield _normalize_candidate(metadata.get('label'))
+    yield _normalize_candidate(metadata.get('description'))
 
     if station:
-        station_candidates = [
-            normalize_candidate(station.get('name')),
-            normalize_candidate(station.get('displayName')),
-            normalize_candidate(station.get('station_name')),
-            normalize_candidate(station.get('full_name')),
-            normalize_candidate(station.get('label')),
-            normalize_candidate(station.get('description')),
-        ]
-        station_candidates.extend(collect_from_mapping(station.get('meta') or {}, ['name', 'label', 'displayName', 'description']))
+        yield _normalize_candidate(station.get('name'))
+        yield _normalize_candidate(station.get('displayName'))
+        yield _normalize_candidate(station.get('station_name'))
+        yield _normalize_candidate(station.get('full_name'))
+        yield _normalize_candidate(station.get('label'))
+        yield _normalize_candidate(station.get('description'))
+        yield from _iter_mapping_candidates(station.get('meta') or {}, ['name', 'label', 'displayName', 'description'])
         location = station.get('location')
         if isinstance(location, dict):
-            station_candidates.extend(collect_from_mapping(location, ['name', 'displayName', 'label', 'description', 'address']))
-            station_candidates.extend(collect_from_mapping(location.get('city') or {}, ['name', 'label']))
-            station_candidates.extend(collect_from_mapping(location.get('region') or {}, ['name', 'label']))
+            yield from _iter_mapping_candidates(location, ['name', 'displayName', 'label', 'description', 'address'])
+            yield from _iter_mapping_candidates(location.get('city') or {}, ['name', 'label'])
+            yield from _iter_mapping_candidates(location.get('region') or {}, ['name', 'label'])
         else:
-            station_candidates.append(normalize_candidate(location))
-        city_name = normalize_candidate((station.get('city') or {}).get('name'))
-        if city_name:
-            station_candidates.append(city_name)
-        station_candidates = [c for c in station_candidates if c]
-        candidates.extend(station_candidates)
-
-    friendly = next((candidate for candidate in candidates if candidate and not _is_generic_station_label(candidate)), None)
-    if not friendly:
-        friendly = next((candidate for candidate in candidates if candidate), None)
+            yield _normalize_candidate(location)
+        yield _normalize_candidate((station.get('city') or {}).get('name'))
+
+
+def _resolve_station_names(sub, station, station_id_int):
+    metadata = sub.get('metadata') or {}
+    nickname_meta = _normalize_candidate(metadata.get('nickname'))
+    if nickname_meta and _is_generic_station_label(nickname_meta):
+        nickname_meta = None
+
+    # Take the first non-generic candidate, remembering the first non-empty
+    # one as the fallback; usually the first candidate or two decide it, so
+    # the rest are never computed.
+    friendly = None
+    first_candidate = None
+    for candidate in _iter_name_candidates(sub, metadata, nickname_meta, station):
+        if not candidate:
+            continue
+        if not _is_generic_station_label(candidate):
+            friendly = candidate
+            break
+        if first_candidate is None:
+            first_candidate = candidate
     if not friendly:
-        friendly = f"Station {station_id_int}"
+        friendly = first_candidate or f"Station {station_id_int}"
 
     nickname = nickname_meta or friendly
     return friendly, nickname
 
+def _to_vn_iso(value):
+    """Format a timestamp as an ISO string in Vietnam time (UTC+7).
+
+    Naive datetimes are treated as UTC. Strings are returned unchanged, and
+    other non-datetime values are stringified; None stays None.
+    """
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        # Millisecond precision, as stored in BSON and as _vn_date_string emits
+        return value.astimezone(VN_TZ).isoformat(timespec='milliseconds')
+    return str(value)
+
+
+def _embedded_reading(station):
+    """Return the latest reading embedded on a station document, if any."""
+    embedded = station.get('latest_reading') if station else None
+    return embedded if isinstance(embedded, dict) and embedded else None
+
+
+def _latest_readings_by_idx(db, station_idxs):
+    """Fetch the newest reading for each WAQI station index in one aggregation.
+
+    Sorting on (meta.station_idx, ts desc) before grouping with `$first`
+    matches the readings index, so the server can take the first key per
+    station instead of sorting every reading.
+    """
+    if not station_idxs:
+        return {}
+    pipeline = [
+        {'$match': {'meta.station_idx': {'$in': station_idxs}}},
+        {'$sort': {'meta.station_idx': 1, 'ts': -1}},
+        {'$group': {
+            '_id': '$meta.station_idx',
+            'aqi': {'$first': '$aqi'},
+            'ts': {'$first': '$ts'},
+            'time': {'$first': '$time'},
+        }},
+        {'$set': {'ts': _vn_date_string('$ts')}},
+    ]
+    try:
+        return {doc['_id']: doc for doc in db.waqi_station_readings.aggregate(pipeline)}
+    except Exception as e:
+        logger.error(f"Error batch-fetching latest readings: {e}")
+        return {}
+
+
+def _cached_latest_readings(db, station_idxs):
+    """Return the latest reading per station index, using `_reading_cache`.
+
+    Only the indexes missing from the cache go to the batched aggregation.
+    """
+    readings = {}
+    missing = []
+    for idx in station_idxs:
+        cached = _reading_cache.get(idx)
+        if cached is None:
+            missing.append(idx)
+        else:
+            readings[idx] = cached
+    for idx, reading in _latest_readings_by_idx(db, missing).items():
+        _reading_cache.set(idx, reading)
+        readings[idx] = reading
+    return readings
+
+
+def _latest_aqi(station, station_id_int, log_debug, reading=None):
+    """Return (current_aqi, last_updated) for a subscription row.
+
+    Uses the reading embedded on the station document, then the batched
+    `reading`, and only then queries the readings for legacy key forms. An
+    empty `reading` means the station is known (cached) to have none.
+    """
+    try:
+        current_aqi = None
+        last_updated = None
+        latest = _embedded_reading(station) or reading
+        if latest:
+            readings = [latest]
+        elif reading is not None:
+            readings = []
+        else:
+            readings = readings_repo.find_latest_by_station(station_id_int, limit=1)
+            if isinstance(station_id_int, int):
+                _reading_cache.set(station_id_int, readings[0] if readings else {})
+        if readings:
+            latest_measurement = readings[0]
+            current_aqi = latest_measurement.get('aqi')
+            # try common timestamp fields
+            ts = latest_measurement.get('ts') or latest_measurement.get('time') or latest_measurement.get('timestamp')
+            # Already a VN-time string when it came from the batched
+            # aggregation or the station projection
+            last_updated = _to_vn_iso(ts)
+            if log_debug:
+                logger.debug("Station %s - DB AQI: %s, timestamp: %s", station_id_int, current_aqi, last_updated)
+        elif log_debug:
+            logger.debug("No readings found in DB for station %s", station_id_int)
+        return current_aqi, last_updated
+    except Exception as e:
+        logger.error(f"Error fetching AQI for station {station_id_int}: {e}")
+        return None, None
+
+
+def _build_subscription_row(sub, station_id_int, station, log_debug, reading=None):
+    """Build one `GET /subscriptions` item from a subscription and its station."""
+    current_aqi, last_updated = _latest_aqi(station, station_id_int, log_debug, reading)
+    if log_debug:
+        logger.debug("Station info for %s: %s", station_id_int, station is not None)
+
+    friendly_name, nickname_value = _resolve_station_names(sub, station, station_id_int)
+
+    # created_at is formatted in VN time by the listing aggregation
+    created_at = sub.get('created_at') or ''
+
+    return {
+        'id': str(sub['_id']),
+        'station_id': station_id_int,
+        'station_name': friendly_name,
+        'location': station.get('location') if station else '',
+        'nickname': nickname_value,
+        'threshold': sub.get('alert_threshold', 100),
+        'alert_enabled': sub.get('status') == 'active',
+        'created_at': created_at,
+        'current_aqi': current_aqi,  # Real AQI from air-quality API
+        'last_updated': last_updated  # Already VN-formatted above when present
+    }
+
 subscriptions_bp = Blueprint('subscriptions', __name__, url_prefix='/api')
 
 
@@ -109,132 +337,71 @@ def get_user_subscriptions():
         if not user_id:
             return jsonify({"error": "unauthorized"}), 401
             
-        # Get user to ensure they exist and get their email
-        user = users_repo.find_by_id(user_id)
-        if not user:
+        # Ensure the user still exists (only _id is fetched)
+        if not users_repo.exists(user_id):
             return jsonify({"error": "user not found"}), 404
             
         db = db_module.get_db()
         
-        # Find active subscriptions for this user
-        subscriptions = list(db.alert_subscriptions.find({
-            'user_id': ObjectId(user_id),
-            'status': {'$ne': 'expired'}
-        }).sort('createdAt', -1))
-
-        # Transform for frontend
-        result = []
-        seen_stations = set()
+        # Find active subscriptions for this user, newest first, keeping only
+        # the newest subscription per station. Grouped on the string form so
+        # legacy string ids ("123") not yet migrated by
+        # scripts_test/normalize_station_ids.py still merge with 123.
+        subscriptions = db.alert_subscriptions.aggregate([
+            {'$match': {'user_id': ObjectId(user_id), 'status': {'$ne': 'expired'}}},
+            {'$sort': {'createdAt': -1}},
+            {'$project': _SUBSCRIPTION_LIST_PROJECTION},
+            {'$group': {'_id': {'$toString': '$station_id'}, 'doc': {'$first': '$$ROOT'}}},
+            {'$replaceRoot': {'newRoot': '$doc'}},
+            {'$sort': {'createdAt': -1}},
+        ])
+
+        # Per-item logging is debug-only; the level check is hoisted out of
+        # the loops.
+        log_debug = logger.isEnabledFor(logging.DEBUG)
+        unique_subs = []
         for sub in subscriptions:
-            station_id = sub['station_id']
             # Normalize to int when possible to keep API surface consistent
             try:
-                station_id_int = int(station_id)
-            except Exception:
-                station_id_int = station_id
-            key = str(station_id_int)
-            if key in seen_stations:
-                logger.debug(f'Skipping duplicate subscription for station_id {key}')
-                continue
-            seen_stations.add(key)
-            logger.info(f"Processing subscription for station_id: {station_id_int}")
-            
-            # Try to get latest AQI for this station using direct DB lookup
-            try:
-                # Prefer direct DB lookup for latest reading to avoid network dependency
-                current_aqi = None
-                last_updated = None
-                readings = readings_repo.find_latest_by_station(station_id_int, limit=1)
-                if readings:
-                    latest_measurement = readings[0]
-                    current_aqi = latest_measurement.get('aqi')
-                    # try common timestamp fields
-                    ts = latest_measurement.get('ts') or latest_measurement.get('time') or latest_measurement.get('timestamp')
-                    try:
-                        # Convert timestamp to Vietnam timezone (UTC+7) when possible
-                        if hasattr(ts, 'isoformat'):
-                            dt = ts
-                            if dt.tzinfo is None:
-                                dt = dt.replace(tzinfo=timezone.utc)
-                            vn = dt.astimezone(timezone(timedelta(hours=7)))
-                            last_updated = vn.isoformat()
-                        else:
-                            last_updated = str(ts) if ts is not None else None
-                    except Exception:
-                        last_updated = str(ts) if ts is not None else None
-                    logger.info(f"Station {station_id_int} - DB AQI: {current_aqi}, timestamp: {last_updated}")
-                else:
-                    logger.info(f"No readings found in DB for station {station_id_int}")
-            except Exception as e:
-                logger.error(f"Error fetching AQI for station {station_id_int}: {e}")
-                current_aqi = None
-                last_updated = None
-            
-            # Get station info: try integer form first, then string (legacy)
-            station = None
-            try:
-                station = db.waqi_stations.find_one({'station_id': station_id_int})
+                station_id_int = int(sub['station_id'])
             except Exception:
-                station = None
-            if not station:
-                try:
-                    station = db.waqi_stations.find_one({'station_id': str(station_id_int)})
-                except Exception:
-                    station = None
-            logger.info(f"Station info for {station_id_int}: {station is not None}")
-
-            metadata = sub.get('metadata') or {}
-            nickname_meta = metadata.get('nickname')
-            if nickname_meta and _is_generic_station_label(nickname_meta):
-                nickname_meta = None
-
-            subscription_name_candidate = sub.get('station_name') or sub.get('name') or sub.get('display_name')
-            if subscription_name_candidate and _is_generic_station_label(subscription_name_candidate):
-                subscription_name_candidate = None
-
-            station_name_candidate = None
-            if station:
-                for field in (station.get('name'), station.get('displayName'), station.get('station_name')):
-                    if field and not _is_generic_station_label(field):
-                        station_name_candidate = field
-                        break
-                if not station_name_candidate:
-                    for field in (station.get('name'), station.get('displayName'), station.get('station_name')):
-                        if field:
-                            station_name_candidate = field
-                            break
-
-            friendly_name = next((value for value in [nickname_meta, subscription_name_candidate, station_name_candidate] if value), None)
-            if not friendly_name or _is_generic_station_label(friendly_name):
-                friendly_name = f"Station {station_id_int}"
-
-            friendly_name, nickname_value = _resolve_station_names(sub, station, station_id_int)
-
-            # Format createdAt to VN timezone if available
-            created_at_raw = sub.get('createdAt')
+                station_id_int = sub['station_id']
+            unique_subs.append((sub, station_id_int))
+
+        # Fetch every subscribed station in one query instead of a find_one per
+        # subscription. waqi_stations.station_id is stored as int (see
+        # scripts_test/normalize_station_ids.py for legacy string ids).
+        station_map = {}
+        missing_keys = []
+        for _, station_key in unique_subs:
+            cached_station = _station_cache.get(station_key)
+            if cached_station is None:
+                missing_keys.append(station_key)
+            else:
+                station_map[str(station_key)] = cached_station
+        if missing_keys:
             try:
-                if created_at_raw and hasattr(created_at_raw, 'isoformat'):
-                    dtc = created_at_raw
-                    if dtc.tzinfo is None:
-                        dtc = dtc.replace(tzinfo=timezone.utc)
-                    created_at = dtc.astimezone(timezone(timedelta(hours=7))).isoformat()
-                else:
-                    created_at = created_at_raw.isoformat() if created_at_raw else ''
+                for station_doc in db.waqi_stations.find({'station_id': {'$in': missing_keys}}, _STATION_LIST_PROJECTION):
+                    station_map[str(station_doc.get('station_id'))] = station_doc
+                    _station_cache.set(station_doc.get('station_id'), station_doc)
             except Exception:
-                created_at = str(created_at_raw) if created_at_raw else ''
-
-            result.append({
-                'id': str(sub['_id']),
-                'station_id': station_id_int,
-                'station_name': friendly_name,
-                'location': station.get('location') if station else '',
-                'nickname': nickname_value,
-                'threshold': sub.get('alert_threshold', 100),
-                'alert_enabled': sub.get('status') == 'active',
-                'created_at': created_at,
-                'current_aqi': current_aqi,  # Real AQI from air-quality API
-                'last_updated': last_updated  # Already VN-formatted above when present
-            })
+                pass
+
+        # Stations without an embedded reading get theirs from the reading
+        # cache or one batched aggregation rather than a readings query each
+        reading_map = _cached_latest_readings(db, [
+            station_id_int for _, station_id_int in unique_subs
+            if isinstance(station_id_int, int)
+            and not _embedded_reading(station_map.get(str(station_id_int)))
+        ])
+
+        result = [
+            _build_subscription_row(
+                sub, station_id_int, station_map.get(str(station_id_int)), log_debug,
+                reading_map.get(station_id_int)
+            )
+            for sub, station_id_int in unique_subs
+        ]
             
         return jsonify({"subscriptions": result}), 200
         
@@ -257,56 +424,81 @@ def subscribe_to_station():
         if not station_id:
             return jsonify({"error": "station_id is required"}), 400
             
-        try:
-            station_id = int(station_id)
-        except ValueError:
+        station_id = _as_int(station_id)
+        if station_id is None:
             return jsonify({"error": "invalid station_id"}), 400
             
-        # Get user to ensure they exist
-        user = users_repo.find_by_id(user_id)
-        if not user:
+        threshold = _as_int(data.get('threshold', 100))
+        if threshold is None:
+            return jsonify({"error": "invalid threshold value"}), 400
+
+        # Ensure the user still exists (only _id is fetched)
+        if not users_repo.exists(user_id):
             return jsonify({"error": "user not found"}), 404
             
         db = db_module.get_db()
         
-        # Check if already subscribed
-        existing = db.alert_subscriptions.find_one({
+        # Duplicate and limit (max 10) checks from one indexed query: fetching
+        # at most 10 live subscriptions is enough to answer both
+        live_subs = list(db.alert_subscriptions.find({
             'user_id': ObjectId(user_id),
-            'station_id': {'$in': [station_id, str(station_id)]},
-            'status': {'$ne': 'expired'}
-        })
-        if existing:
+            'status': {'$in': ['active', 'paused']}
+        }, {'station_id': 1}).limit(10))
+        # Legacy subscriptions may still store the id as a string ("123")
+        if any(str(sub.get('station_id')) == str(station_id) for sub in live_subs):
             return jsonify({"error": "already subscribed to this station"}), 409
-            
-        # Check subscription limit (max 10)
-        count = db.alert_subscriptions.count_documents({
-            'user_id': ObjectId(user_id),
-            'status': {'$ne': 'expired'}
-        })
-        if count >= 10:
+        if len(live_subs) >= 10:
             return jsonify({"error": "subscription limit reached (maximum 10 stations)"}), 400
             
+        # Default label is only formatted when the client sent neither name
+        if 'nickname' in data:
+            nickname = data['nickname']
+        elif 'station_name' in data:
+            nickname = data['station_name']
+        else:
+            nickname = f'Station {station_id}'
+
         # Create subscription
         now = datetime.now(timezone.utc)
+        subscription_id = ObjectId()
         subscription = {
-            'user_id': ObjectId(user_id),
-            'station_id': station_id,
-            'alert_threshold': int(data.get('threshold', 100)),
+            '_id': subscription_id,
+            'alert_threshold': threshold,
             'status': 'active' if data.get('alert_enabled', True) else 'paused',
             'createdAt': now,
             'updatedAt': None,
             'last_triggered': None,
             'email_count': 0,
             'metadata': {
-                'nickname': data.get('nickname', data.get('station_name', f'Station {station_id}'))
+                'nickname': nickname
             }
         }
         
-        result = db.alert_subscriptions.insert_one(subscription)
+        # Atomic insert-if-absent: user_id is seeded from the filter on insert
+        # (station_id is not, since it matches both id forms); an existing
+        # live subscription is returned untouched
+        try:
+            existing = db.alert_subscriptions.find_one_and_update(
+                {
+                    'user_id': ObjectId(user_id),
+                    'station_id': {'$in': [station_id, str(station_id)]},
+                    'status': {'$in': ['active', 'paused']}
+                },
+                {'$setOnInsert': {**subscription, 'station_id': station_id}},
+                projection={'_id': 1},
+                upsert=True,
+                return_document=ReturnDocument.BEFORE
+            )
+        except DuplicateKeyError:
+            # Concurrent upserts both missed; the unique live-subscription
+            # index rejected the second one
+            return jsonify({"error": "already subscribed to this station"}), 409
+        if existing is not None:
+            return jsonify({"error": "already subscribed to this station"}), 409
         
         return jsonify({
             "message": "subscribed successfully",
-            "subscription_id": str(result.inserted_id)
+            "subscription_id": str(subscription_id)
         }), 201
         
     except Exception as e:
@@ -328,14 +520,14 @@ def unsubscribe_from_station():
         if not station_id:
             return jsonify({"error": "station_id is required"}), 400
             
-        try:
-            station_id = int(station_id)
-        except ValueError:
+        station_id = _as_int(station_id)
+        if station_id is None:
             return jsonify({"error": "invalid station_id"}), 400
             
         db = db_module.get_db()
         
-        # Find and update subscription to expired status
+        # Find and update subscription to expired status; string ids not yet
+        # migrated by scripts_test/normalize_station_ids.py match too
         result = db.alert_subscriptions.update_one(
             {
                 'user_id': ObjectId(user_id),
@@ -383,17 +575,16 @@ def update_subscription(subscription_id):
         update_doc = {'updatedAt': datetime.now(timezone.utc)}
         
         if 'threshold' in data:
-            try:
-                threshold = int(data['threshold'])
-                logger.info(f"Processing threshold update: {threshold}")
-                if 0 <= threshold <= 500:
-                    update_doc['alert_threshold'] = threshold
-                    logger.info(f"Threshold {threshold} added to update_doc")
-                else:
-                    logger.warning(f"Threshold {threshold} out of range")
-                    return jsonify({"error": "threshold must be between 0 and 500"}), 400
-            except ValueError:
+            threshold = _as_int(data['threshold'])
+            if threshold is None:
                 return jsonify({"error": "invalid threshold value"}), 400
+            logger.info(f"Processing threshold update: {threshold}")
+            if 0 <= threshold <= 500:
+                update_doc['alert_threshold'] = threshold
+                logger.info(f"Threshold {threshold} added to update_doc")
+            else:
+                logger.warning(f"Threshold {threshold} out of range")
+                return jsonify({"error": "threshold must be between 0 and 500"}), 400
                 
         if 'alert_enabled' in data:
             update_doc['status'] = 'active' if data['alert_enabled'] else 'paused'
@@ -1,64 +1,148 @@
-from flask import Blueprint, render_template, jsonify, redirect, url_for, request
+import hashlib
+
+from flask import Blueprint, Response, abort, current_app, render_template, jsonify, make_response, redirect, url_for, request
 
 web_bp = Blueprint('web', __name__)
 
-@web_bp.route('/')
-def dashboard():
-    return render_template('dashboard/index.html')
 
-@web_bp.route('/admin')
-def admin_dashboard():
-    """Admin dashboard for user management."""
-    return render_template('admin/user_management.html')
+def _get_template(name):
+    """Return a compiled template, kept per app so views skip the Jinja lookup.
+
+    When template auto-reload is on (debug), templates are looked up on every
+    call so edits still show up without a restart.
+    """
+    env = current_app.jinja_env
+    if env.auto_reload:
+        return env.get_template(name)
+    templates = current_app.extensions.setdefault('web_templates', {})
+    template = templates.get(name)
+    if template is None:
+        template = templates[name] = env.get_template(name)
+    return template
+
+
+def _render_static_page(name):
+    body = render_template(_get_template(name)).encode('utf-8')
+    return body, hashlib.sha1(body).hexdigest()
+
+
+def _get_static_page(name):
+    """Return (body bytes, ETag) for a template that has no per-request content.
+
+    Cached per app and script root, since url_for() output depends on it.
+    """
+    if current_app.jinja_env.auto_reload:
+        return _render_static_page(name)
+    pages = current_app.extensions.setdefault('web_static_pages', {})
+    key = (name, request.script_root)
+    page = pages.get(key)
+    if page is None:
+        page = pages[key] = _render_static_page(name)
+    return page
+
 
-@web_bp.route('/login')
-def login_page():
-    return render_template('auth/login.html')
+def _static_page_response(name, cache_control='no-cache'):
+    """Serve a pre-rendered page, answering 304 when the client's ETag matches.
 
-@web_bp.route('/register')
-def register_page():
-    return render_template('auth/register.html')
+    The default `no-cache` lets browsers keep the page but revalidate it on
+    every visit, so a deploy is picked up immediately.
+    """
+    body, etag = _get_static_page(name)
+    # body is already encoded bytes (Content-Length is set from it), so the
+    # WSGI server can take it as-is instead of through Werkzeug's encoder
+    response = Response(
+        body,
+        mimetype='text/html',
+        headers={'Cache-Control': cache_control},
+        direct_passthrough=True,
+    )
+    response.set_etag(etag)
+    return response.make_conditional(request)
+
+
+# Pages that only render a fixed template with no per-request content:
+# endpoint -> (rules, template). Served pre-rendered with an ETag.
+# Endpoint names match the view functions they replaced, so existing
+# url_for('web.<endpoint>') calls keep working.
+_TEMPLATE_PAGES = {
+    'dashboard': (('/',), 'dashboard/index.html'),
+    # Admin dashboard for user management
+    'admin_dashboard': (('/admin',), 'admin/user_management.html'),
+    'login_page': (('/login',), 'auth/login.html'),
+    'register_page': (('/register',), 'auth/register.html'),
+    'reports_page': (('/reports',), 'reports/summary.html'),
+    'forgot_password_page': (('/forgot-password',), 'auth/forgot.html'),
+    # Station Subscriptions management UI; frontend links sometimes point
+    # to the `.html` path
+    'subscriptions_page': (('/subscriptions', '/subscriptions.html'), 'dashboard/subscriptions.html'),
+    'admin_add_user': (('/admin/users/add',), 'admin/add_user.html'),
+}
+
+
+def _make_page_view(endpoint, template_name):
+    # A named function rather than functools.partial: Flask-Limiter reads
+    # the view's __name__/__qualname__ on every request
+    def view():
+        return _static_page_response(template_name)
+    view.__name__ = view.__qualname__ = endpoint
+    return view
+
+
+for _endpoint, (_rules, _template_name) in _TEMPLATE_PAGES.items():
+    _view = _make_page_view(_endpoint, _template_name)
+    for _rule in _rules:
+        web_bp.add_url_rule(_rule, endpoint=_endpoint, view_func=_view)
 
 
 @web_bp.route('/terms')
 def terms_page():
-    """Render the Terms of Service page."""
-    return render_template('auth/terms_of_service.html')
+    """Render the Terms of Service page.
 
-@web_bp.route('/reports')
-def reports_page():
-    return render_template('reports/summary.html')
+    The page is plain HTML that only changes on deploy: it is rendered once
+    and browsers/proxies may reuse it for a day.
+    """
+    return _static_page_response('auth/terms_of_service.html', 'public, max-age=86400')
 
-@web_bp.route('/forgot-password')
-def forgot_password_page():
-    return render_template('auth/forgot.html')
 
 @web_bp.route('/reset-password')
 def reset_password_page():
-    return render_template('auth/reset.html')
+    # Echoes the reset token from the query string, so it is rendered per request
+    return render_template(_get_template('auth/reset.html'))
 
 
 @web_bp.route('/verify-code')
 def verify_code_page():
     # optional email query param for context
-    from flask import request
     email = request.args.get('email', '')
-    return render_template('auth/verifycode.html', email=email)
+    response = make_response(render_template(_get_template('auth/verifycode.html'), email=email))
+    # Rendered per request, but a matching ETag still saves resending the body
+    response.add_etag()
+    return response.make_conditional(request)
 
 
+def _alias_target(endpoint):
+    """Build the redirect URL for an alias once per app and script root."""
+    targets = current_app.extensions.setdefault('web_alias_targets', {})
+    key = (endpoint, request.script_root)
+    url = targets.get(key)
+    if url is None:
+        url = targets[key] = url_for(endpoint)
+    return url
+
 
 # Short aliases
 @web_bp.route('/forgot')
 def forgot_alias():
-    return redirect(url_for('web.forgot_password_page'), code=302)
+    return redirect(_alias_target('web.forgot_password_page'), code=302)
 
 @web_bp.route('/reset')
 def reset_alias():
-    return redirect(url_for('web.reset_password_page'), code=302)
+    return redirect(_alias_target('web.reset_password_page'), code=302)
 
 @web_bp.route('/clear-auth')
 def clear_auth():
-    return render_template('clear_auth.html')
+    # Static page (all logic is client-side): rendered once, cacheable by proxies
+    return _static_page_response('clear_auth.html', 'public, max-age=3600')
 
 
 @web_bp.route('/debug/headers', methods=['GET', 'POST'])
@@ -66,34 +150,15 @@ def debug_headers():
     """Temporary debug endpoint: returns incoming request headers as JSON.
 
     Use this locally to confirm whether the Authorization header (or others)
-    are reaching the Flask app. Do NOT enable or expose this in production.
+    are reaching the Flask app. Only served when the app runs in debug mode.
     """
-    try:
-        hdrs = {k: v for k, v in request.headers.items()}
-        return jsonify({"headers": hdrs}), 200
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
-
-
-# Station Subscriptions page (UI)
-@web_bp.route('/subscriptions.html')
-@web_bp.route('/subscriptions')
-def subscriptions_page():
-    """Render the Station Subscriptions management UI.
-
-    Both `/subscriptions` and `/subscriptions.html` are supported because
-    the frontend links sometimes point to the `.html` path.
-    """
-    return render_template('dashboard/subscriptions.html')
+    if not current_app.debug:
+        abort(404)
+    return jsonify({"headers": dict(request.headers)}), 200
 
 
 @web_bp.route('/admin/users/<user_id>/edit')
 def admin_edit_user(user_id: str):
     """Render the admin edit user page. Frontend will fetch user details via API."""
-    return render_template('admin/edit_user.html', user_id=user_id)
-
+    return render_template(_get_template('admin/edit_user.html'), user_id=user_id)
 
-@web_bp.route('/admin/users/add')
-def admin_add_user():
-    """Render the admin add user page."""
-    return render_template('admin/add_user.html')
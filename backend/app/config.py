@@ -12,6 +12,8 @@ The helpers fall back to defaults and emit warnings when parsing fails.
 
 import os
 import logging
+import tempfile
+from datetime import timedelta
 from typing import Optional
 from dotenv import load_dotenv
 
@@ -20,6 +22,9 @@ load_dotenv()
 
 _logger = logging.getLogger(__name__)
 
+# Values accepted as "enabled" for boolean settings
+_TRUTHY_VALUES = frozenset(('true', '1', 'on', 'yes'))
+
 
 def _strip_inline_comment(val: str) -> str:
     """Strip an inline comment from a string and trim whitespace/quotes.
@@ -28,13 +33,10 @@ def _strip_inline_comment(val: str) -> str:
     """
     if val is None:
         return ''
-    # Split on first '#' to remove inline comments
-    val = val.split('#', 1)[0]
-    val = val.strip()
+    # Drop everything from the first '#' (partition avoids a list allocation)
+    val = val.partition('#')[0].strip()
     # Remove surrounding single/double quotes if present
-    if (val.startswith('"') and val.endswith('"')) or (
-        val.startswith("'") and val.endswith("'")
-    ):
+    if len(val) >= 2 and val[0] == val[-1] and val[0] in ('"', "'"):
         val = val[1:-1]
     return val
 
@@ -62,7 +64,7 @@ def _get_bool_env(name: str, default: bool) -> bool:
     raw = _get_env(name)
     if raw is None:
         return default
-    return raw.lower() in ['true', '1', 'on', 'yes']
+    return raw.lower() in _TRUTHY_VALUES
 
 
 class Config:
@@ -71,7 +73,6 @@ class Config:
     # Flask settings
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key-change-in-production'
     # JWT settings
-    from datetime import timedelta
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or SECRET_KEY
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1)
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=7)
@@ -79,6 +80,12 @@ class Config:
     # MongoDB settings
     MONGO_URI = os.environ.get('MONGO_URI') or 'mongodb://localhost:27017/'
     MONGO_DB = os.environ.get('MONGO_DB') or 'air_quality_monitoring'
+    # Connection pool per worker process, shared by API requests and the
+    # in-process schedulers. Keep MONGO_MAX_POOL_SIZE x workers below the
+    # cluster's connection limit.
+    MONGO_MAX_POOL_SIZE = _get_int_env('MONGO_MAX_POOL_SIZE', 100)
+    MONGO_MIN_POOL_SIZE = _get_int_env('MONGO_MIN_POOL_SIZE', 10)
+    MONGO_WAIT_QUEUE_TIMEOUT_MS = _get_int_env('MONGO_WAIT_QUEUE_TIMEOUT_MS', 5000)
 
     # External API settings
     GEOS_CF_DATASET_URL = os.environ.get('GEOS_CF_DATASET_URL') or 'https://gmao.gsfc.nasa.gov/geos_cf/'
@@ -98,6 +105,11 @@ class Config:
     # Cache settings
     CACHE_TYPE = os.environ.get('CACHE_TYPE') or 'simple'
     CACHE_DEFAULT_TIMEOUT = _get_int_env('CACHE_DEFAULT_TIMEOUT', 300)
+    # Directory for compiled Jinja templates, so restarted workers skip
+    # recompiling them. Defaults to a directory under the system temp dir.
+    JINJA_BYTECODE_CACHE_DIR = _get_env(
+        'JINJA_BYTECODE_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'aqm-jinja-cache')
+    )
 
     # Station reading scheduler settings
     STATION_POLLING_INTERVAL_MINUTES = _get_int_env('STATION_POLLING_INTERVAL_MINUTES', 60)
@@ -123,7 +135,13 @@ class Config:
     # to new user documents. Some deployments prefer to omit this field and
     # treat missing status as 'active'. Set environment variable
     # REGISTER_SET_STATUS_ON_REGISTRATION=true to enable writing the field.
-    REGISTER_SET_STATUS_ON_REGISTRATION = os.environ.get('REGISTER_SET_STATUS_ON_REGISTRATION', 'false').lower() in ['true', '1', 'on', 'yes']
+    REGISTER_SET_STATUS_ON_REGISTRATION = _get_bool_env('REGISTER_SET_STATUS_ON_REGISTRATION', False)
+
+    # notification_logs expire after 90 days through a TTL index on sentAt.
+    # Older databases have a plain sentAt index that blocks it; replacing
+    # that index makes MongoDB delete all existing logs older than 90 days,
+    # so it only happens when this is set explicitly.
+    NOTIFICATION_LOG_TTL_REPLACE_INDEX = _get_bool_env('NOTIFICATION_LOG_TTL_REPLACE_INDEX', False)
 
 
 class DevelopmentConfig(Config):
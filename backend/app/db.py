@@ -7,11 +7,22 @@ error handling, and common database operations for the Air Quality Monitoring sy
 from __future__ import annotations
 
 import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from types import MappingProxyType
 from typing import Optional
-from pymongo import MongoClient
+from bson import ObjectId
+from bson.codec_options import CodecOptions, TypeDecoder, TypeRegistry
+import pymongo
+from pymongo import IndexModel, MongoClient
 from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
 from pymongo.read_preferences import ReadPreference
-from flask import current_app, g
+from flask import current_app
+
+from .cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
@@ -19,64 +30,157 @@ class DatabaseError(Exception):
     """Custom exception for database-related errors."""
     pass
 
+
+class ObjectIdStrDecoder(TypeDecoder):
+    """Decode BSON ObjectId values directly to their hex string."""
+
+    bson_type = ObjectId
+
+    def transform_bson(self, value):
+        return str(value)
+
+
+# Codec options for read paths whose documents go straight into JSON
+# responses: ObjectIds are stringified by the BSON decoder itself, so
+# callers no longer need to walk documents converting `_id` by hand.
+JSON_CODEC_OPTIONS = CodecOptions(type_registry=TypeRegistry([ObjectIdStrDecoder()]))
+
+# Connection options shared by the primary and read-only clients; pool
+# sizing comes from the app config (see _pool_options)
+MONGO_CLIENT_OPTIONS = MappingProxyType({
+    'serverSelectionTimeoutMS': 5000,  # 5 second timeout
+    'connectTimeoutMS': 10000,         # 10 second connection timeout
+    'socketTimeoutMS': 20000,          # 20 second socket timeout (long aggregations)
+})
+
+# One MongoClient per process, shared by every request. MongoClient is
+# thread-safe and pools its own connections, so creating one per request only
+# added a TCP/TLS/auth handshake (and a ping) to each call.
+_client: Optional[MongoClient] = None
+_client_key: Optional[tuple] = None
+_client_lock = threading.Lock()
+# When only a read-only (secondary-preferred) client could be created, try the
+# primary again after this monotonic deadline instead of staying read-only.
+_read_only_until = 0.0
+READ_ONLY_RETRY_SECONDS = 30
+
+
+def _pool_options() -> dict:
+    """Pool sizing from the app config (MONGO_MAX_POOL_SIZE and friends)."""
+    config = current_app.config
+    return {
+        'maxPoolSize': config.get('MONGO_MAX_POOL_SIZE', 100),
+        'minPoolSize': config.get('MONGO_MIN_POOL_SIZE', 10),  # warm sockets, no cold handshakes
+        'waitQueueTimeoutMS': config.get('MONGO_WAIT_QUEUE_TIMEOUT_MS', 5000),  # waiters fail fast
+    }
+
+
+def _close_quietly(client: Optional[MongoClient]) -> None:
+    """Close a client that is no longer used, releasing its monitors and pool."""
+    if client is None:
+        return
+    try:
+        client.close()
+    except Exception as e:
+        logger.debug(f"Error closing superseded MongoDB client: {e}")
+
+
+def _create_client(mongo_uri: str) -> MongoClient:
+    """Create a pooled client, falling back to secondaries if there is no primary."""
+    global _read_only_until
+    pool_options = _pool_options()
+    client = None
+    try:
+        client = MongoClient(mongo_uri, retryWrites=True, **MONGO_CLIENT_OPTIONS, **pool_options)
+
+        # Test the connection once, when the shared client is created
+        client.admin.command('ping')
+        _read_only_until = 0.0
+        logger.info("MongoDB connection established successfully")
+        return client
+
+    except (ConnectionFailure, ServerSelectionTimeoutError) as e:
+        # The failed client already runs monitor threads; don't leak it
+        _close_quietly(client)
+        # If the cluster has no primary (ReplicaSetNoPrimary) we can still
+        # operate in read-only mode by preferring secondaries. Create a
+        # secondary-preferred client as a fallback so read-only endpoints
+        # continue to work instead of failing hard at startup.
+        msg = str(e)
+        if 'Primary()' in msg or 'ReplicaSetNoPrimary' in msg:
+            logger.warning('Primary not available; creating secondary-preferred MongoDB client for read-only operations: %s', e)
+            try:
+                client = MongoClient(
+                    mongo_uri,
+                    retryWrites=False,
+                    read_preference=ReadPreference.SECONDARY_PREFERRED,
+                    **MONGO_CLIENT_OPTIONS,
+                    **pool_options
+                )
+                # Avoid a blocking ping here; assume secondaries available and
+                # let operations surface errors when they run. Log info so
+                # operators know we've fallen back.
+                _read_only_until = time.monotonic() + READ_ONLY_RETRY_SECONDS
+                logger.info('Secondary-preferred MongoDB client created (read-only fallback)')
+                return client
+            except Exception as e2:
+                logger.error('Failed to create secondary-preferred MongoDB client: %s', e2)
+                raise DatabaseError(f'Database connection failed and fallback failed: {e2}')
+        logger.error(f"Failed to connect to MongoDB: {e}")
+        raise DatabaseError(f"Database connection failed: {e}")
+    except Exception as e:
+        _close_quietly(client)
+        logger.error(f"Unexpected error connecting to MongoDB: {e}")
+        raise DatabaseError(f"Unexpected database error: {e}")
+
+
+def _client_is_current(key: tuple) -> bool:
+    if _client is None or _client_key != key:
+        return False
+    return not _read_only_until or time.monotonic() < _read_only_until
+
+
 def get_mongo_client() -> MongoClient:
-    """Get or create MongoDB client instance.
-    
+    """Get the shared MongoDB client, creating it on first use.
+
+    The client is cached per process (a forked worker builds its own) and
+    per URI. A read-only fallback client is kept for a short while and then
+    replaced once the primary is reachable again.
+
     Returns:
         MongoClient: Configured MongoDB client instance
         
     Raises:
         DatabaseError: If connection cannot be established
     """
-    if 'mongo_client' not in g:
-        try:
-            mongo_uri = current_app.config['MONGO_URI']
-            g.mongo_client = MongoClient(
-                mongo_uri,
-                serverSelectionTimeoutMS=5000,  # 5 second timeout
-                connectTimeoutMS=10000,         # 10 second connection timeout
-                socketTimeoutMS=20000,          # 20 second socket timeout
-                maxPoolSize=50,                 # Maximum connection pool size
-                retryWrites=True
-            )
-            
-            # Test the connection
-            g.mongo_client.admin.command('ping')
-            logger.info("MongoDB connection established successfully")
-            
-        except (ConnectionFailure, ServerSelectionTimeoutError) as e:
-            # If the cluster has no primary (ReplicaSetNoPrimary) we can still
-            # operate in read-only mode by preferring secondaries. Create a
-            # secondary-preferred client as a fallback so read-only endpoints
-            # continue to work instead of failing hard at startup.
-            msg = str(e)
-            if 'Primary()' in msg or 'ReplicaSetNoPrimary' in msg:
-                logger.warning('Primary not available; creating secondary-preferred MongoDB client for read-only operations: %s', e)
-                try:
-                    g.mongo_client = MongoClient(
-                        mongo_uri,
-                        serverSelectionTimeoutMS=5000,
-                        connectTimeoutMS=10000,
-                        socketTimeoutMS=20000,
-                        maxPoolSize=50,
-                        retryWrites=False,
-                        read_preference=ReadPreference.SECONDARY_PREFERRED,
-                    )
-                    # Avoid a blocking ping here; assume secondaries available and
-                    # let operations surface errors when they run. Log info so
-                    # operators know we've fallen back.
-                    logger.info('Secondary-preferred MongoDB client created (read-only fallback)')
-                except Exception as e2:
-                    logger.error('Failed to create secondary-preferred MongoDB client: %s', e2)
-                    raise DatabaseError(f'Database connection failed and fallback failed: {e2}')
-            else:
-                logger.error(f"Failed to connect to MongoDB: {e}")
-                raise DatabaseError(f"Database connection failed: {e}")
-        except Exception as e:
-            logger.error(f"Unexpected error connecting to MongoDB: {e}")
-            raise DatabaseError(f"Unexpected database error: {e}")
-    
-    return g.mongo_client
+    global _client, _client_key, _read_only_until
+    key = (os.getpid(), current_app.config['MONGO_URI'])
+    if _client_is_current(key):
+        return _client
+
+    with _client_lock:
+        if _client_is_current(key):
+            return _client
+        if _client is not None and _client_key == key:
+            # Read-only fallback expired: keep serving reads from it if the
+            # primary is still unavailable
+            try:
+                new_client = _create_client(key[1])
+            except DatabaseError:
+                _read_only_until = time.monotonic() + READ_ONLY_RETRY_SECONDS
+                return _client
+            old_client, _client = _client, new_client
+            _close_quietly(old_client)
+            return _client
+        old_client, old_key = _client, _client_key
+        _client = _create_client(key[1])
+        _client_key = key
+        # A client inherited from the parent process is left alone: its
+        # sockets belong to the parent. A client for a previous URI in this
+        # process is closed.
+        if old_key is not None and old_key[0] == key[0]:
+            _close_quietly(old_client)
+        return _client
 
 
 def get_db():
@@ -94,13 +198,18 @@ def get_db():
 
 
 def close_db(error: Optional[Exception] = None) -> None:
-    """Close database connection if it exists.
-    
+    """Close the shared database client if it exists.
+
+    Not registered as a request teardown: the client lives for the whole
+    process. Call this on shutdown (or between tests) to release the pool.
+
     Args:
         error: Optional exception that caused the close (for logging)
     """
-    mongo_client = g.pop('mongo_client', None)
-    
+    global _client, _client_key
+    with _client_lock:
+        mongo_client, _client, _client_key = _client, None, None
+
     if mongo_client is not None:
         try:
             mongo_client.close()
@@ -114,22 +223,19 @@ def close_db(error: Optional[Exception] = None) -> None:
 
 def init_app(app) -> None:
     """Initialize database connection with Flask app.
+
+    The shared client's pool is sized from MONGO_MAX_POOL_SIZE,
+    MONGO_MIN_POOL_SIZE and MONGO_WAIT_QUEUE_TIMEOUT_MS in the app config.
     
     Args:
         app: Flask application instance
     """
-    # Register teardown handler to close connections
-    app.teardown_appcontext(close_db)
-    
     # Test initial connection during app startup
     with app.app_context():
         try:
-            client = get_mongo_client()
-            db = get_db()
-            
-            # Verify we can list collections (basic connectivity test)
-            collections = db.list_collection_names()
-            logger.info(f"Database initialization successful. Found {len(collections)} collections.")
+            # Creating the shared client already pings the server
+            get_mongo_client()
+            logger.info(f"Database initialization successful ({current_app.config['MONGO_DB']} reachable).")
             
         except DatabaseError as e:
             logger.error(f"Database initialization failed: {e}")
@@ -138,6 +244,14 @@ def init_app(app) -> None:
             logger.error(f"Unexpected error during database initialization: {e}")
 
 
+# Upper bound, in seconds, for all MongoDB operations in health_check()
+HEALTH_CHECK_TIMEOUT_SECONDS = 2
+
+# Server version and collection count rarely change; health_check() refreshes
+# them at most once a minute instead of on every probe
+_health_details_cache = TTLCache(maxsize=1, ttl=60)
+
+
 def health_check() -> dict:
     """Perform database health check.
     
@@ -145,23 +259,28 @@ def health_check() -> dict:
         dict: Health check results with status and details
     """
     try:
-        client = get_mongo_client()
-        db = get_db()
-        
-        # Ping the database
-        client.admin.command('ping')
-        
-        # Get server info
-        server_info = client.server_info()
-        
-        # Count collections
-        collection_count = len(db.list_collection_names())
+        # Bound the whole probe so /api/health answers quickly when the
+        # cluster is unreachable instead of waiting on server selection
+        with pymongo.timeout(HEALTH_CHECK_TIMEOUT_SECONDS):
+            client = get_mongo_client()
+
+            # Ping the database (requests themselves no longer ping); this is
+            # the only round trip while the details below are cached
+            client.admin.command('ping')
+
+            details = _health_details_cache.get('details')
+            if details is None:
+                details = {
+                    'server_version': client.server_info().get('version', 'unknown'),
+                    'collections': len(get_db().list_collection_names()),
+                }
+                _health_details_cache.set('details', details)
         
         return {
             'status': 'healthy',
             'database': current_app.config['MONGO_DB'],
-            'server_version': server_info.get('version', 'unknown'),
-            'collections': collection_count,
+            'server_version': details['server_version'],
+            'collections': details['collections'],
             'message': 'Database connection is operational'
         }
         
@@ -182,8 +301,20 @@ def health_check() -> dict:
 
 # Common database operations utilities
 
+# Bump whenever the index definitions in ensure_indexes() change so the next
+# boot applies them instead of trusting the marker left by the previous set.
+INDEX_VERSION = 4
+INDEX_MARKER_COLLECTION = '_meta'
+
+
 def ensure_indexes() -> bool:
     """Ensure all required indexes are created.
+
+    A marker document in `_meta` records the INDEX_VERSION that was fully
+    applied; later boots (and the other workers) find it and skip the
+    create_index round trips. The marker is only written when every required
+    index was created, and also records whether the notification log TTL
+    may replace the old sentAt index (NOTIFICATION_LOG_TTL_REPLACE_INDEX).
     
     Returns:
         bool: True if all indexes were created/verified successfully
@@ -200,12 +331,33 @@ def ensure_indexes() -> bool:
             return False
 
         db = get_db()
+        marker = db[INDEX_MARKER_COLLECTION]
+        # Part of the marker, so turning the flag on re-runs index creation
+        enforce_log_ttl = bool(current_app.config.get('NOTIFICATION_LOG_TTL_REPLACE_INDEX', False))
+        if marker.find_one({'_id': 'indexes', 'version': INDEX_VERSION, 'notificationLogTtl': enforce_log_ttl}, {'_id': 1}):
+            logger.info("Database indexes already at version %s - skipping creation", INDEX_VERSION)
+            return True
+        complete = True
+
+        # One createIndexes command per collection; indexes that need their
+        # own error handling (fallbacks, TTL option conflicts) stay separate.
 
         # Station readings indexes
         readings_collection = db.waqi_station_readings
-        readings_collection.create_index([('station_id', 1), ('ts', -1)])
-        readings_collection.create_index([('ts', -1)])
-        readings_collection.create_index([('location', '2dsphere')])
+        # Latest-reading lookups (stations get_latest_reading) match on either
+        # station key and sort by ts descending; both need the ts -1 suffix
+        readings_collection.create_indexes([
+            IndexModel([('station_id', 1), ('ts', -1)]),
+            IndexModel([('meta.station_idx', 1), ('ts', -1)]),
+            IndexModel([('ts', -1)]),
+        ])
+        # 2dsphere builds fail on a single malformed legacy coordinate, so
+        # they are kept out of the B-tree batches above and below
+        try:
+            readings_collection.create_index([('location', '2dsphere')])
+        except Exception:
+            logger.warning('Could not create 2dsphere index for waqi_station_readings')
+            complete = False
 
         # Stations indexes
         stations_collection = db.waqi_stations
@@ -218,39 +370,77 @@ def ensure_indexes() -> bool:
                 stations_collection.create_index([('station_id', 1)], unique=True)
             except Exception:
                 # Ignore to avoid startup failure (index may already exist or conflict)
-                pass
-        stations_collection.create_index([('location', '2dsphere')])
-        stations_collection.create_index([('city', 1)])
+                complete = False
+        try:
+            stations_collection.create_index([('location', '2dsphere')])
+        except Exception:
+            logger.warning('Could not create 2dsphere index for waqi_stations')
+            complete = False
+        stations_collection.create_indexes([
+            IndexModel([('city', 1)]),
+            # Station list search is an $or of unanchored case-insensitive
+            # regexes on city.name and city.location. Each branch can at best
+            # scan its whole index (smaller than the documents), and the $or
+            # only avoids a collection scan when every branch is indexed.
+            IndexModel([('city.name', 1)]),
+            IndexModel([('city.location', 1)]),
+        ])
         
         # Forecasts indexes
         forecasts_collection = db.waqi_daily_forecasts
-        forecasts_collection.create_index([('station_id', 1), ('forecast_date', -1)])
-        forecasts_collection.create_index([('forecast_date', -1)])
+        forecasts_collection.create_indexes([
+            IndexModel([('station_id', 1), ('forecast_date', -1)]),
+            IndexModel([('forecast_date', -1)]),
+        ])
         
         # Users indexes
         users_collection = db.users
-        users_collection.create_index([('email', 1)], unique=True)
-        users_collection.create_index([('username', 1)], unique=True)
+        users_collection.create_indexes([
+            IndexModel([('email', 1)], unique=True),
+            IndexModel([('username', 1)], unique=True),
+        ])
 
         # Password reset tokens indexes (TTL on expiresAt)
         resets_collection = db.password_resets
-        # Token hash lookup
-        resets_collection.create_index([('tokenHash', 1)])
+        resets_collection.create_indexes([
+            # Token lookup also bounds expiresAt, so expired tokens are skipped in the index
+            IndexModel([('tokenHash', 1), ('expiresAt', 1)]),
+            # Per-email rate limit counts requests since a createdAt cutoff
+            IndexModel([('email', 1), ('createdAt', -1)]),
+        ])
         # TTL index: documents expire at expiresAt
         try:
             resets_collection.create_index('expiresAt', expireAfterSeconds=0)
         except Exception:
             # If TTL index options conflict, ignore silently to avoid startup failure
             pass
+        # Prefix of the token compound above
+        try:
+            resets_collection.drop_index('tokenHash_1')
+        except Exception:
+            pass
 
         # Email validation cache TTL index (expiresAt) to support caching for 24 hours
         try:
             email_cache = db.email_validation_cache
-            email_cache.create_index('email', unique=True)
-            email_cache.create_index('expiresAt', expireAfterSeconds=0)
+            email_cache.create_indexes([
+                IndexModel('email', unique=True),
+                IndexModel('expiresAt', expireAfterSeconds=0),
+            ])
         except Exception:
             # Ignore index errors to avoid blocking startup
             pass
+        # Revoked JWTs: checked by jti on every authenticated request and
+        # removed once the token itself has expired
+        try:
+            blocklist = db.jwt_blocklist
+            blocklist.create_indexes([
+                IndexModel('jti'),
+                IndexModel('expiresAt', expireAfterSeconds=0),
+            ])
+        except Exception:
+            logger.debug('Could not create indexes for jwt_blocklist')
+            complete = False
         # API response cache TTL index (used by nearest endpoint cache)
         try:
             api_cache = db.api_response_cache
@@ -261,28 +451,93 @@ def ensure_indexes() -> bool:
         # Alert subscriptions indexes: efficient lookups by user, station, status and threshold
         try:
             subs = db.alert_subscriptions
-            subs.create_index([('user_id', 1)])
-            subs.create_index([('station_id', 1)])
-            subs.create_index([('station_id', 1), ('alert_threshold', 1), ('status', 1)])
-            subs.create_index([('user_id', 1), ('status', 1)])
+            subs.create_indexes([
+                # Alert evaluation: subscriptions by station and threshold
+                IndexModel([('station_id', 1), ('alert_threshold', 1), ('status', 1)]),
+                # User listing: filter on user/status and sort by createdAt from the index
+                IndexModel([('user_id', 1), ('status', 1), ('createdAt', -1)]),
+                # Subscribe/unsubscribe existence checks and updates
+                IndexModel([('user_id', 1), ('station_id', 1), ('status', 1)]),
+            ])
+            # At most one live subscription per (user, station); makes concurrent
+            # subscribe requests fail atomically instead of racing the pre-check.
+            # Optional: it needs MongoDB 6.0+ ($in in a partial filter) and no
+            # duplicate live subscriptions, so a failure does not hold back the
+            # index marker. After cleaning up (scripts_test/normalize_station_ids.py),
+            # delete the `_meta` 'indexes' document to have the next boot retry it.
+            try:
+                subs.create_index(
+                    [('user_id', 1), ('station_id', 1)],
+                    unique=True,
+                    partialFilterExpression={'status': {'$in': ['active', 'paused']}},
+                    name='uniq_live_user_station'
+                )
+            except Exception as e:
+                logger.warning(
+                    'Could not create unique live-subscription index (needs MongoDB 6.0+ '
+                    'and no duplicate live subscriptions; see scripts_test/normalize_station_ids.py). '
+                    'Concurrent duplicate subscribes are not rejected until it exists: %s', e
+                )
+            # The compounds above make these older prefix indexes redundant
+            for name in ('user_id_1', 'station_id_1', 'user_id_1_status_1'):
+                try:
+                    subs.drop_index(name)
+                except Exception:
+                    pass
         except Exception:
             logger.debug('Could not create indexes for alert_subscriptions')
+            complete = False
 
         # Notification logs: indexing for auditing and TTL retention
         try:
             logs = db.notification_logs
-            logs.create_index([('subscription_id', 1)])
-            logs.create_index([('user_id', 1)])
-            logs.create_index([('station_id', 1)])
-            logs.create_index([('sentAt', 1)])
+            logs.create_indexes([
+                # Alert rate limiting counts a user's deliveries for a station
+                # since a sentAt cutoff
+                IndexModel([('user_id', 1), ('station_id', 1), ('sentAt', -1)]),
+                IndexModel([('station_id', 1), ('sentAt', -1)]),
+            ])
             # ttl: keep logs for 90 days
+            log_ttl_seconds = 90 * 24 * 60 * 60
             try:
-                logs.create_index('sentAt', expireAfterSeconds=90 * 24 * 60 * 60)
+                logs.create_index('sentAt', expireAfterSeconds=log_ttl_seconds)
             except Exception:
-                # ignore conflicts with existing TTL settings
-                pass
+                # Older deployments have a plain sentAt_1 index under the same
+                # name, which blocks the TTL index. Replacing it makes MongoDB
+                # delete all history older than 90 days, so only do it when
+                # NOTIFICATION_LOG_TTL_REPLACE_INDEX is set.
+                if enforce_log_ttl:
+                    try:
+                        logs.drop_index('sentAt_1')
+                        logs.create_index('sentAt', expireAfterSeconds=log_ttl_seconds)
+                    except Exception:
+                        # ignore conflicts with existing TTL settings
+                        pass
+                else:
+                    logger.info(
+                        'notification_logs has a plain sentAt index, so the 90-day TTL is not applied; '
+                        'set NOTIFICATION_LOG_TTL_REPLACE_INDEX=true to replace it (deletes older logs)'
+                    )
+            # Single-field indexes superseded by the compounds above
+            for name in ('subscription_id_1', 'user_id_1', 'station_id_1'):
+                try:
+                    logs.drop_index(name)
+                except Exception:
+                    pass
         except Exception:
             logger.debug('Could not create indexes for notification_logs')
+            complete = False
+
+        if complete:
+            marker.update_one(
+                {'_id': 'indexes'},
+                {'$set': {
+                    'version': INDEX_VERSION,
+                    'notificationLogTtl': enforce_log_ttl,
+                    'updatedAt': datetime.now(timezone.utc),
+                }},
+                upsert=True
+            )
         
         logger.info("Database indexes created/verified successfully")
         return True
@@ -292,21 +547,62 @@ def ensure_indexes() -> bool:
         return False
 
 
+# Held while an index bootstrap runs so one process never issues the
+# createIndexes commands twice concurrently
+_index_bootstrap_lock = threading.Lock()
+
+
+def _bootstrap_indexes(app) -> None:
+    """Thread target for start_index_bootstrap()."""
+    if not _index_bootstrap_lock.acquire(blocking=False):
+        logger.debug('Index bootstrap already running in this process')
+        return
+    try:
+        with app.app_context():
+            ensure_indexes()
+    except Exception as e:
+        logger.warning(f"Could not ensure DB indexes at startup: {e}")
+    finally:
+        _index_bootstrap_lock.release()
+
+
+def start_index_bootstrap(app) -> threading.Thread:
+    """Run ensure_indexes() in a daemon thread so app startup doesn't wait on it.
+
+    Index builds on a cold, production-size database can take minutes;
+    meanwhile queries still work, just without the new indexes.
+    
+    Args:
+        app: Flask application instance
+        
+    Returns:
+        threading.Thread: The started bootstrap thread
+    """
+    thread = threading.Thread(target=_bootstrap_indexes, args=(app,), name='ensure-indexes', daemon=True)
+    thread.start()
+    return thread
+
+
 def get_collection_stats() -> dict:
     """Get statistics for all collections in the database.
+
+    MongoDB has no single command returning every collection's count, so
+    the per-collection metadata counts are issued concurrently on the
+    shared client's pool: the wait is about one round trip instead of one
+    per collection.
     
     Returns:
         dict: Collection names and document counts
     """
     try:
         db = get_db()
-        stats = {}
-        
-        for collection_name in db.list_collection_names():
-            collection = db[collection_name]
-            stats[collection_name] = collection.estimated_document_count()
-            
-        return stats
+        names = db.list_collection_names()
+        if not names:
+            return {}
+
+        with ThreadPoolExecutor(max_workers=min(8, len(names))) as pool:
+            counts = pool.map(lambda name: db[name].estimated_document_count(), names)
+            return dict(zip(names, counts))
         
     except Exception as e:
         logger.error(f"Failed to get collection stats: {e}")
@@ -8,6 +8,7 @@ from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from flask_login import LoginManager
 from . import db
+from .cache import TTLCache
 from flask_jwt_extended import JWTManager
 
 # Initialize Flask extensions
@@ -20,6 +21,12 @@ limiter = Limiter(
 login_manager = LoginManager()
 jwt = JWTManager()
 
+# Blocklist lookups by jti. Nearly every token is not revoked, so caching
+# the answer spares a MongoDB round trip on each authenticated request.
+# A token revoked through another worker is still accepted here for up to
+# `ttl` seconds; logout evicts the entry in its own worker.
+jwt_blocklist_cache = TTLCache(maxsize=10000, ttl=30)
+
 
 def init_extensions(app):
     """Initialize Flask extensions with app context.
@@ -57,8 +64,12 @@ def init_extensions(app):
             jti = jwt_payload.get("jti")
             if not jti:
                 return False
-            doc = database.jwt_blocklist.find_one({"jti": jti})
-            return doc is not None
+            revoked = jwt_blocklist_cache.get(jti)
+            if revoked is None:
+                # Project only jti (and drop _id) so the jti index covers the lookup
+                revoked = database.jwt_blocklist.find_one({"jti": jti}, {"_id": 0, "jti": 1}) is not None
+                jwt_blocklist_cache.set(jti, revoked)
+            return revoked
         except Exception:
             # Fail-safe: if we cannot check, do not block
             return False
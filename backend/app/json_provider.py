@@ -0,0 +1,70 @@
+"""orjson-backed JSON provider for `jsonify` and `current_app.json`.
+
+Output matches Flask's default provider: keys are sorted and dates are
+rendered as HTTP dates. ObjectIds are additionally serialized as their hex
+string. When orjson is not installed `create_app` keeps Flask's default
+provider.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import decimal
+import json
+import uuid
+from datetime import date
+from typing import Any
+
+import orjson
+from bson import ObjectId
+from flask.json.provider import JSONProvider
+from werkzeug.http import http_date
+
+# Datetimes are passed through to `_default` so they keep Flask's HTTP-date
+# format instead of orjson's RFC 3339 output
+_ORJSON_OPTIONS = (
+    orjson.OPT_SORT_KEYS
+    | orjson.OPT_NON_STR_KEYS
+    | orjson.OPT_PASSTHROUGH_DATETIME
+    | orjson.OPT_SERIALIZE_NUMPY
+)
+
+
+def _default(o: Any) -> Any:
+    """Serialize the types Flask's default provider supports, plus ObjectId."""
+    if isinstance(o, date):
+        return http_date(o)
+    if isinstance(o, ObjectId):
+        return str(o)
+    if isinstance(o, (decimal.Decimal, uuid.UUID)):
+        return str(o)
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    if hasattr(o, "__html__"):
+        return str(o.__html__())
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+class OrjsonProvider(JSONProvider):
+    """JSON provider serializing with orjson (compact, sorted keys)."""
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if kwargs:
+            # Callers asking for stdlib options (indent, separators, ...)
+            kwargs.setdefault("default", _default)
+            kwargs.setdefault("sort_keys", True)
+            return json.dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS).decode()
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        if kwargs:
+            return json.loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        # orjson already produces UTF-8 bytes; skip the str round trip
+        return self._app.response_class(
+            orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS),
+            mimetype="application/json",
+        )
@@ -10,19 +10,32 @@ import logging
 from functools import wraps
 from typing import Any, Callable
 
-from flask import jsonify
+from flask import g, jsonify
 from flask_jwt_extended import get_jwt, verify_jwt_in_request
 
 logger = logging.getLogger(__name__)
 
 
+def get_cached_jwt() -> dict:
+    """Verify the request's JWT once and return its claims.
+
+    The claims are kept on `flask.g`, so chained middlewares in the same
+    request reuse them instead of decoding the token (and checking the
+    blocklist) again. Raises the usual flask_jwt_extended errors when the
+    token is missing or invalid.
+    """
+    if "jwt_claims" not in g:
+        verify_jwt_in_request()
+        g.jwt_claims = get_jwt() or {}
+    return g.jwt_claims
+
+
 def admin_required(func: Callable[..., Any]) -> Callable[..., Any]:
     """Ensure the current request is authorized as an admin."""
 
     @wraps(func)
     def wrapper(*args: Any, **kwargs: Any) -> Any:
-        verify_jwt_in_request()
-        claims = get_jwt() or {}
+        claims = get_cached_jwt()
         if claims.get("role") != "admin":
             logger.warning(
                 "Admin access denied",
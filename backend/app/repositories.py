@@ -7,32 +7,41 @@ abstracting database operations and providing a clean interface for the API laye
 from __future__ import annotations
 
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime, timezone
 from pymongo.collection import Collection
 from pymongo.errors import DuplicateKeyError, PyMongoError
 from bson import ObjectId
+from bson.codec_options import CodecOptions
 from bson.errors import InvalidId
 
 from . import db
 
 logger = logging.getLogger(__name__)
 
+# Shared pool for count queries issued alongside a page fetch
+_count_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='repo-count')
+
 
 class BaseRepository:
     """Base repository class with common database operations."""
 
-    def __init__(self, collection_name: str):
+    def __init__(self, collection_name: str, codec_options: Optional[CodecOptions] = None):
         """Initialize repository with collection name.
 
         Args:
             collection_name: Name of the MongoDB collection
+            codec_options: Optional BSON codec options applied to the collection
         """
         self.collection_name = collection_name
+        self.codec_options = codec_options
 
     @property
     def collection(self) -> Collection:
         database = db.get_db()
+        if self.codec_options is not None:
+            return database.get_collection(self.collection_name, codec_options=self.codec_options)
         return database[self.collection_name]
 
     def find_one(self, filter_dict: Dict[str, Any]) -> Optional[Dict[str, Any]]:
@@ -88,7 +97,8 @@ class BaseRepository:
 
 class StationsRepository(BaseRepository):
     def __init__(self):
-        super().__init__('waqi_stations')
+        # Station documents are only ever served as JSON; decode _id as str
+        super().__init__('waqi_stations', codec_options=db.JSON_CODEC_OPTIONS)
 
     def find_by_station_id(self, station_id: str) -> Optional[Dict[str, Any]]:
         return self.find_one({'station_id': station_id})
@@ -99,15 +109,49 @@ class StationsRepository(BaseRepository):
     def find_active_stations(self) -> List[Dict[str, Any]]:
         return self.find_many({'status': 'active'})
 
-    def find_with_pagination(self, filter_dict: Optional[Dict[str, Any]] = None, limit: int = 20, offset: int = 0) -> tuple[List[Dict[str, Any]], int]:
+    def find_with_pagination(
+        self,
+        filter_dict: Optional[Dict[str, Any]] = None,
+        limit: int = 20,
+        offset: int = 0,
+        include_total: bool = False,
+        sort: Optional[List[tuple]] = None,
+        keyset: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[int], bool]:
+        """Return one page of stations, the total match count and a has-next flag.
+
+        One extra document is fetched to decide whether a next page exists, so
+        no count is needed for plain paging. The total is only computed when
+        `include_total` is set (and is None otherwise): unfiltered totals come
+        from collection metadata (`estimated_document_count`); filtered totals
+        are counted on a worker thread while the page is fetched.
+
+        `keyset` (a cursor clause) only narrows the page query; the total still
+        counts every document matching `filter_dict`.
+        """
         if filter_dict is None:
             filter_dict = {}
         try:
-            total_count = self.collection.count_documents(filter_dict)
-            cursor = self.collection.find(filter_dict)
-            cursor = cursor.skip(offset).limit(limit)
-            stations = list(cursor)
-            return stations, total_count
+            # Resolve the collection here: db.get_db() needs the app context
+            collection = self.collection
+            count_future = None
+            total_count: Optional[int] = None
+            if include_total:
+                if filter_dict:
+                    count_future = _count_executor.submit(collection.count_documents, filter_dict)
+                else:
+                    total_count = collection.estimated_document_count()
+            page_filter = {'$and': [filter_dict, keyset]} if keyset else filter_dict
+            cursor = collection.find(page_filter)
+            if sort:
+                cursor = cursor.sort(sort)
+            stations = list(cursor.skip(offset).limit(limit + 1))
+            has_next = len(stations) > limit
+            if has_next:
+                del stations[limit:]
+            if count_future is not None:
+                total_count = count_future.result()
+            return stations, total_count, has_next
         except PyMongoError as e:
             logger.error(f"Error finding stations with pagination: {e}")
             raise
@@ -266,6 +310,18 @@ class UsersRepository(BaseRepository):
             return None
         return self.find_one({'_id': oid})
 
+    def exists(self, user_id: Any) -> bool:
+        """Return True if a user with `user_id` exists (fetches only `_id`)."""
+        try:
+            oid = user_id if isinstance(user_id, ObjectId) else ObjectId(user_id)
+        except (InvalidId, TypeError, ValueError):
+            return False
+        try:
+            return self.collection.find_one({'_id': oid}, {'_id': 1}) is not None
+        except PyMongoError as e:
+            logger.error(f"Error checking user {user_id}: {e}")
+            raise
+
     def list_with_filters(self, filter_dict: Optional[Dict[str, Any]], page: int, page_size: int, sort: Optional[List[Tuple[str, int]]]) -> Tuple[List[Dict[str, Any]], int]:
         if filter_dict is None:
             filter_dict = {}
@@ -22,12 +22,14 @@ try {
 
 // Ensure indexes for alert_subscriptions
 try {
-  db.alert_subscriptions.createIndex({ user_id: 1 });
-  db.alert_subscriptions.createIndex({ station_id: 1 });
   // composite for querying subscriptions by station and threshold (e.g., find subscriptions where threshold <= current aqi)
   db.alert_subscriptions.createIndex({ station_id: 1, alert_threshold: 1, status: 1 });
-  // ensure quick lookup by user and status
-  db.alert_subscriptions.createIndex({ user_id: 1, status: 1 });
+  // user listing by status, newest first (also serves user-only lookups)
+  db.alert_subscriptions.createIndex({ user_id: 1, status: 1, createdAt: -1 });
+  // subscribe/unsubscribe checks by user and station
+  db.alert_subscriptions.createIndex({ user_id: 1, station_id: 1, status: 1 });
+  // one live (active/paused) subscription per user and station
+  db.alert_subscriptions.createIndex({ user_id: 1, station_id: 1 }, { unique: true, partialFilterExpression: { status: { $in: ['active', 'paused'] } }, name: 'uniq_live_user_station' });
   print('Indexes created for alert_subscriptions');
 } catch (e) {
   print('Failed creating indexes on alert_subscriptions: ' + e);
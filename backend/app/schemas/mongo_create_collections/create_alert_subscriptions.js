@@ -61,7 +61,7 @@ db.createCollection("alert_subscriptions", {
 });
 
 // Create indexes for alert_subscriptions
-db.alert_subscriptions.createIndex({"user_id": 1});
-db.alert_subscriptions.createIndex({"station_id": 1});
 db.alert_subscriptions.createIndex({"station_id": 1, "alert_threshold": 1, "status": 1});
-db.alert_subscriptions.createIndex({"user_id": 1, "status": 1});
+db.alert_subscriptions.createIndex({"user_id": 1, "status": 1, "createdAt": -1});
+db.alert_subscriptions.createIndex({"user_id": 1, "station_id": 1, "status": 1});
+db.alert_subscriptions.createIndex({"user_id": 1, "station_id": 1}, { "unique": true, "partialFilterExpression": {"status": {"$in": ["active", "paused"]}}, "name": "uniq_live_user_station" });
@@ -78,6 +78,9 @@ db.createCollection("waqi_stations", {
         },
         "latest_reading_at": {
           "bsonType": "string"
+        },
+        "latest_reading": {
+          "bsonType": "object"
         }
       }
     }
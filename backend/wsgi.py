@@ -9,12 +9,9 @@ Usage examples:
   - Development: python -m flask --app wsgi:app run --debug
   - Gunicorn:   gunicorn wsgi:app -w 4 -b 0.0.0.0:8000
 """
-from dotenv import load_dotenv
+# Importing the app package loads .env (if present) via backend.app.config
 from backend.app import create_app
 
-# Load environment variables from .env (if present)
-load_dotenv()
-
 # Create the Flask application
 app = create_app()
 
@@ -318,19 +318,30 @@ class CurrentReadingManager:
             self.logger.error(f"Error checking if should insert reading for station {station_idx}: {e}")
             return False
 
-    def update_station_latest_reading_at(self, station_idx: int, time_iso: str) -> None:
+    def update_station_latest_reading_at(self, station_idx: int, time_iso: str,
+                                         reading: Optional[Dict[str, Any]] = None) -> None:
         """
         Update latest_reading_at field in waqi_stations collection.
         
+        When the inserted reading is given, a trimmed copy is also embedded as
+        `latest_reading` so API lookups can read it from the station document
+        instead of joining and sorting waqi_station_readings.
+        
         Args:
             station_idx: Station ID
             time_iso: ISO timestamp from reading (e.g., "2025-09-11T18:00:00+07:00")
+            reading: Optional reading document that was just inserted
         """
         try:
             if not self.dry_run:
+                update = {'latest_reading_at': time_iso}
+                if reading is not None:
+                    update['latest_reading'] = {
+                        k: reading[k] for k in ('ts', 'aqi', 'time', 'iaqi', 'meta') if k in reading
+                    }
                 result = self.stations_collection.update_one(
                     {'_id': station_idx},
-                    {'$set': {'latest_reading_at': time_iso}},
+                    {'$set': update},
                     upsert=False
                 )
                 if result.modified_count > 0:
@@ -575,8 +586,8 @@ class CurrentReadingManager:
                 try:
                     result = self.readings_collection.insert_one(reading)
                     if result.inserted_id:
-                        # Update station's latest_reading_at after successful insert
-                        self.update_station_latest_reading_at(station_idx, time_iso)
+                        # Update station's latest_reading_at (and embedded reading) after successful insert
+                        self.update_station_latest_reading_at(station_idx, time_iso, reading)
                         self.logger.debug(f"Successfully inserted reading for station {station_idx}")
                         return True
                     else:
@@ -416,6 +416,9 @@ def bulk_upsert_stations(
         # index on station_id does not receive null values which break bulk ops.
         if station.get('station_id') is None:
             station['station_id'] = station['_id']
+        elif isinstance(station['station_id'], str) and station['station_id'].lstrip('-').isdigit():
+            # Keep station_id an int so lookups need a single type
+            station['station_id'] = int(station['station_id'])
 
         operation = UpdateOne(
             {'_id': station['_id']},
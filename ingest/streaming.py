@@ -39,6 +39,15 @@ except Exception:
 logger = logging.getLogger(__name__)
 
 
+# Values accepted as "enabled" for on/off environment flags
+_TRUTHY_VALUES = frozenset(('true', '1', 'on', 'yes'))
+
+
+def _env_flag(name: str, default: str = 'true') -> bool:
+    """Return whether the on/off environment flag `name` is enabled."""
+    return os.environ.get(name, default).lower() in _TRUTHY_VALUES
+
+
 def _parse_int_env_from_env(name: str, default: int) -> int:
     """Read an environment variable, strip inline comments/quotes, and parse an int.
 
@@ -84,14 +93,14 @@ class DataIngestionScheduler:
         # Station reading configuration
         self.station_polling_interval_minutes = _parse_int_env_from_env('STATION_POLLING_INTERVAL_MINUTES', 60)
         self.station_script_timeout_seconds = _parse_int_env_from_env('STATION_SCRIPT_TIMEOUT_SECONDS', 300)
-        self.enable_station_scheduler = os.environ.get('ENABLE_STATION_SCHEDULER', 'true').lower() in ['true', '1', 'on', 'yes']
+        self.enable_station_scheduler = _env_flag('ENABLE_STATION_SCHEDULER')
 
         # Forecast ingestion configuration
         forecast_env_value = os.environ.get('STATION_FORECAST_INTERVAL_MINUTES', '1440')
         print(f"=== DEBUG: STATION_FORECAST_INTERVAL_MINUTES environment value = '{forecast_env_value}' ===")
         self.forecast_polling_interval_minutes = _parse_int_env_from_env('STATION_FORECAST_INTERVAL_MINUTES', 1440)  # Default 24 hours
         self.forecast_script_timeout_seconds = _parse_int_env_from_env('FORECAST_SCRIPT_TIMEOUT_SECONDS', 600)
-        self.enable_forecast_scheduler = os.environ.get('ENABLE_FORECAST_SCHEDULER', 'true').lower() in ['true', '1', 'on', 'yes']
+        self.enable_forecast_scheduler = _env_flag('ENABLE_FORECAST_SCHEDULER')
         print(f"=== DEBUG: Forecast scheduler will run every {self.forecast_polling_interval_minutes} minutes ===")
         
         # Script paths
@@ -347,7 +356,7 @@ class DataIngestionScheduler:
 
             # Add alerts monitor job if available and enabled
             try:
-                alert_enabled = os.environ.get('ALERT_MONITOR_ENABLED', 'true').lower() in ['true', '1', 'on', 'yes']
+                alert_enabled = _env_flag('ALERT_MONITOR_ENABLED')
                 alert_interval = _parse_int_env_from_env('ALERT_MONITOR_INTERVAL_MINUTES', 15)
             except Exception:
                 alert_enabled = True
@@ -357,7 +366,7 @@ class DataIngestionScheduler:
             # explicitly disable the in-process monitor with
             # IN_PROCESS_ALERT_MONITOR=false.
             celery_configured = bool(os.environ.get('CELERY_BROKER_URL'))
-            in_process_alerts_allowed = os.environ.get('IN_PROCESS_ALERT_MONITOR', 'true').lower() in ['true', '1', 'on', 'yes']
+            in_process_alerts_allowed = _env_flag('IN_PROCESS_ALERT_MONITOR')
 
             if alert_enabled and monitor_favorite_stations is not None and in_process_alerts_allowed and not celery_configured:
                 # Ensure the monitor runs inside the Flask application context
@@ -406,7 +415,7 @@ class DataIngestionScheduler:
 
             # Run alerts monitor immediately if enabled and available
             try:
-                alert_enabled = os.environ.get('ALERT_MONITOR_ENABLED', 'true').lower() in ['true', '1', 'on', 'yes']
+                alert_enabled = _env_flag('ALERT_MONITOR_ENABLED')
             except Exception:
                 alert_enabled = True
 
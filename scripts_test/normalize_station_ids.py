@@ -0,0 +1,128 @@
+"""Backfill script to store `station_id` as an integer.
+
+Older imports and subscriptions wrote some `station_id` values as strings
+("1583") while newer ones use ints, in both `waqi_stations` and
+`alert_subscriptions`. Station lookups only query the int form, so string
+ids would not be found there. This script is idempotent and safe to run multiple times. It
+converts every integer-like string `station_id` to an int with a single
+server-side `update_many`; non-numeric strings are left untouched and
+reported.
+
+Usage (PowerShell):
+  # dry-run (default) - only report what would be changed
+  python scripts_test\\normalize_station_ids.py --dry-run
+
+  # perform changes
+  python scripts_test\\normalize_station_ids.py
+
+Notes:
+- Always run with `--dry-run` first, and consider a backup/snapshot for
+  production data before mass updates.
+- If a station exists under both the int and the string id, the unique
+  index on `station_id` makes the conversion fail for that document; such
+  duplicates are listed so they can be merged by hand. The same applies to
+  live subscriptions held under both forms (unique per user and station).
+- The app skips that unique live-subscription index when duplicates exist
+  and does not retry it on later boots. Once they are merged, delete the
+  `_meta` document with `_id: 'indexes'` so the next start creates it.
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+
+from pymongo import MongoClient
+from pymongo.database import Database
+from pymongo.errors import PyMongoError
+
+try:
+    from dotenv import load_dotenv
+    load_dotenv()
+except Exception:
+    # python-dotenv not installed; rely on environment variables
+    pass
+
+
+def get_database() -> Database:
+    """Create a pymongo database object using MONGO_URI / MONGO_DB env vars."""
+    mongo_uri = os.environ.get('MONGO_URI', 'mongodb://localhost:27017/')
+    mongo_db = os.environ.get('MONGO_DB', 'air_quality_monitoring')
+    client = MongoClient(mongo_uri)
+    return client[mongo_db]
+
+logger = logging.getLogger("normalize_station_ids")
+logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+
+# Strings that $toInt can convert without error
+INT_STRING_FILTER = {"station_id": {"$type": "string", "$regex": r"^-?\d+$"}}
+
+
+def normalize_station_ids(database, collection_name: str = "waqi_stations", dry_run: bool = True) -> dict:
+    """Convert integer-like string station ids in `collection_name` to ints.
+
+    Returns a summary dict.
+    """
+    coll = database[collection_name]
+    to_update = coll.count_documents(INT_STRING_FILTER)
+    non_numeric = coll.count_documents({"station_id": {"$type": "string", "$not": {"$regex": r"^-?\d+$"}}})
+
+    # Report string ids whose int form already exists (would violate a unique
+    # index: station_id on stations, live user+station on subscriptions).
+    # The existing int keys are fetched in one query, not one per document.
+    subscriptions = collection_name == "alert_subscriptions"
+    live = {"status": {"$in": ["active", "paused"]}} if subscriptions else {}
+    projection = {"station_id": 1, "user_id": 1}
+    candidates = list(coll.find({**INT_STRING_FILTER, **live}, projection=projection))
+    candidate_ids = list({int(doc["station_id"]) for doc in candidates})
+
+    def clash_key(doc):
+        station_id = int(doc["station_id"])
+        return (doc.get("user_id"), station_id) if subscriptions else station_id
+
+    existing = set()
+    if candidate_ids:
+        int_filter = {"station_id": {"$in": candidate_ids}, **live}
+        existing = {clash_key(doc) for doc in coll.find(int_filter, projection=projection)}
+    duplicates = [doc["_id"] for doc in candidates if clash_key(doc) in existing]
+
+    updated = 0
+    if not dry_run and to_update:
+        try:
+            res = coll.update_many(
+                {**INT_STRING_FILTER, "_id": {"$nin": duplicates}},
+                [{"$set": {"station_id": {"$toInt": "$station_id"}}}]
+            )
+            updated = res.modified_count
+        except PyMongoError as e:
+            logger.exception("Failed to convert station ids: %s", e)
+
+    return {
+        "to_update": to_update,
+        "updated": updated,
+        "non_numeric": non_numeric,
+        "duplicates": duplicates,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert string station_id values to int in waqi_stations and alert_subscriptions.")
+    parser.add_argument("--dry-run", action="store_true", help="Don't write changes, only show what would be done")
+
+    args = parser.parse_args()
+
+    try:
+        database = get_database()
+    except Exception as e:
+        logger.exception("Failed to get DB connection: %s", e)
+        return
+
+    for collection_name in ("waqi_stations", "alert_subscriptions"):
+        logger.info("Starting %s.station_id normalization (dry_run=%s)" % (collection_name, args.dry_run))
+        summary = normalize_station_ids(database, collection_name, dry_run=args.dry_run)
+        logger.info("%s normalization summary: %s", collection_name, summary)
+    logger.info("Done.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+from datetime import datetime, timezone
+
+from bson import ObjectId
+from flask import Flask, jsonify
+from flask.json.provider import DefaultJSONProvider
+
+from backend.app.json_provider import OrjsonProvider
+
+
+def _app():
+    app = Flask(__name__)
+    app.json = OrjsonProvider(app)
+    return app
+
+
+def test_matches_default_provider_output():
+    app = _app()
+    payload = {'b': 1, 'a': [1.5, None, 'Hà Nội'], 'when': datetime(2025, 1, 2, 3, 4, 5, tzinfo=timezone.utc)}
+    expected = DefaultJSONProvider(app).loads(DefaultJSONProvider(app).dumps(payload))
+    assert app.json.loads(app.json.dumps(payload)) == expected
+    assert app.json.dumps({'b': 1, 'a': 2}) == '{"a":2,"b":1}'
+
+
+def test_serializes_object_id():
+    oid = ObjectId()
+    assert _app().json.dumps({'_id': oid}) == f'{{"_id":"{oid}"}}'
+
+
+def test_jsonify_uses_provider():
+    app = _app()
+    with app.app_context():
+        resp = jsonify(stations=[{'station_id': 1}], total=1)
+    assert resp.mimetype == 'application/json'
+    assert resp.get_json() == {'stations': [{'station_id': 1}], 'total': 1}
+
+
+def test_stdlib_options_fall_back():
+    assert _app().json.dumps({'a': 1}, indent=2) == '{\n  "a": 1\n}'
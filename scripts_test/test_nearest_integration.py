@@ -8,7 +8,7 @@ class FakeCollection:
         self.agg_result = agg_result or []
         self._cache = {}
 
-    def aggregate(self, pipeline):
+    def aggregate(self, pipeline, **kwargs):
         # Return an iterator like pymongo cursor
         return iter(self.agg_result)
 
@@ -27,10 +27,16 @@ class FakeDB:
         self.waqi_stations = FakeCollection(agg_result=stations_result)
         self.api_response_cache = FakeCollection()
 
+    def get_collection(self, name, **kwargs):
+        return getattr(self, name)
+
 
 @pytest.fixture
 def app(monkeypatch):
-    from backend.app.blueprints.api.stations.routes import stations_bp
+    from backend.app.blueprints.api.stations.routes import stations_bp, _local_nearest_cache
+
+    # The in-process nearest cache outlives a single test; start each one cold
+    _local_nearest_cache.clear()
 
     app = Flask(__name__)
     app.register_blueprint(stations_bp, url_prefix='/api/stations')
@@ -117,3 +123,41 @@ def test_nearest_cache_used(app, monkeypatch):
     data2 = resp2.get_json()
     # Should return cached first response (stationA)
     assert data2 == data1
+
+
+def test_nearest_etag_not_modified(app, monkeypatch):
+    station_doc = {
+        '_id': 'stationE',
+        'station_id': 'E',
+        'name': 'E',
+        'location': {'type': 'Point', 'coordinates': [106.0, 10.0]},
+        'dist': {'calculated': 1000},
+        'latest_reading': {'aqi': 10}
+    }
+
+    fake_db = FakeDB(stations_result=[station_doc])
+    monkeypatch.setattr('backend.app.db.get_db', lambda: fake_db)
+
+    client = app.test_client()
+    url = '/api/stations/nearest?lat=10.0&lng=106.0&radius=5'
+    resp1 = client.get(url)
+    assert resp1.status_code == 200
+    etag = resp1.headers.get('ETag')
+    assert etag
+
+    resp2 = client.get(url, headers={'If-None-Match': etag})
+    assert resp2.status_code == 304
+    assert resp2.get_data() == b''
+
+    resp3 = client.get(url, headers={'If-None-Match': '"stale"'})
+    assert resp3.status_code == 200
+    assert resp3.get_json() == resp1.get_json()
+
+
+def test_nearest_rejects_out_of_range_params(app):
+    client = app.test_client()
+    assert client.get('/api/stations/nearest?lat=10.0').status_code == 400
+    resp = client.get('/api/stations/nearest?lat=95&lng=106.0')
+    assert resp.status_code == 400
+    assert 'lat' in resp.get_json()['error']
+    assert client.get('/api/stations/nearest?lat=10&lng=106&radius=80').status_code == 400
@@ -0,0 +1,200 @@
+import re
+
+import pytest
+from bson import ObjectId
+from flask import Flask
+
+
+def _bson_key(value):
+    # Numbers sort before ObjectIds in a MongoDB sort
+    return (1, str(value)) if isinstance(value, ObjectId) else (0, value)
+
+
+_BSON_TYPE_NAMES = {int: 'int', str: 'string', ObjectId: 'objectId'}
+
+
+def _field(doc, path):
+    for part in path.split('.'):
+        if not isinstance(doc, dict):
+            return None
+        doc = doc.get(part)
+    return doc
+
+
+def _matches_value(value, cond):
+    if isinstance(cond, re.Pattern):
+        return isinstance(value, str) and cond.search(value) is not None
+    if isinstance(cond, dict):
+        if '$gt' in cond:
+            bound = cond['$gt']
+            return type(value) is type(bound) and value > bound
+        if '$type' in cond:
+            return _BSON_TYPE_NAMES.get(type(value)) in cond['$type']
+    return value == cond
+
+
+def _matches(doc, filter_doc):
+    for key, cond in (filter_doc or {}).items():
+        if key == '$and':
+            if not all(_matches(doc, sub) for sub in cond):
+                return False
+        elif key == '$or':
+            if not any(_matches(doc, sub) for sub in cond):
+                return False
+        elif not _matches_value(_field(doc, key), cond):
+            return False
+    return True
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = list(docs)
+
+    def skip(self, n):
+        self.docs = self.docs[n:]
+        return self
+
+    def sort(self, keys):
+        for field, direction in reversed(keys):
+            self.docs.sort(key=lambda d: _bson_key(d[field]), reverse=direction < 0)
+        return self
+
+    def limit(self, n):
+        self.docs = self.docs[:n]
+        return self
+
+    def __iter__(self):
+        return iter(self.docs)
+
+
+class FakeStations:
+    def __init__(self, docs):
+        self.docs = docs
+        self.count_calls = 0
+
+    def find(self, filter_doc=None):
+        return FakeCursor(d for d in self.docs if _matches(d, filter_doc))
+
+    def count_documents(self, filter_doc):
+        self.count_calls += 1
+        return sum(1 for d in self.docs if _matches(d, filter_doc))
+
+    def estimated_document_count(self):
+        self.count_calls += 1
+        return len(self.docs)
+
+
+class FakeDB:
+    def __init__(self, docs):
+        self.waqi_stations = FakeStations(docs)
+
+    def get_collection(self, name, **kwargs):
+        return getattr(self, name)
+
+
+@pytest.fixture
+def fake_db():
+    return FakeDB([
+        {'_id': i, 'station_id': i, 'city': {'name': 'Hanoi' if i < 3 else 'Hue'}}
+        for i in range(5)
+    ])
+
+
+@pytest.fixture
+def client(monkeypatch, fake_db):
+    from backend.app.blueprints.api.stations.routes import stations_bp
+
+    from backend.app.json_provider import OrjsonProvider
+
+    app = Flask(__name__)
+    # As in create_app(): serializes ObjectId _ids
+    app.json = OrjsonProvider(app)
+    app.register_blueprint(stations_bp, url_prefix='/api/stations')
+    app.testing = True
+    monkeypatch.setattr('backend.app.db.get_db', lambda: fake_db)
+    return app.test_client()
+
+
+def test_has_next_without_count(client, fake_db):
+    resp = client.get('/api/stations/?limit=2&offset=0')
+    assert resp.status_code == 200
+    data = resp.get_json()
+    assert [s['_id'] for s in data['stations']] == [0, 1]
+    assert data['pagination']['has_next'] is True
+    assert 'total' not in data['pagination']
+    assert fake_db.waqi_stations.count_calls == 0
+
+
+def test_last_page_has_no_next(client):
+    data = client.get('/api/stations/?limit=2&offset=4').get_json()
+    assert [s['_id'] for s in data['stations']] == [4]
+    assert data['pagination']['has_next'] is False
+    assert data['pagination']['has_prev'] is True
+
+
+def test_include_total(client, fake_db):
+    data = client.get('/api/stations/?limit=2&include_total=1&city=h').get_json()
+    assert data['pagination']['total'] == 5
+    assert data['pagination']['pages'] == 3
+    assert fake_db.waqi_stations.count_calls == 1
+
+
+def test_include_total_with_after_counts_whole_result(client):
+    data = client.get('/api/stations/?limit=2&include_total=1&city=hanoi&after=0').get_json()
+    assert [s['_id'] for s in data['stations']] == [1, 2]
+    assert data['pagination']['total'] == 3
+    assert data['pagination']['pages'] == 2
+
+
+def test_after_cursor_seeks_past_last_id(client):
+    first = client.get('/api/stations/?limit=2').get_json()
+    assert [s['_id'] for s in first['stations']] == [0, 1]
+    cursor = first['pagination']['next_cursor']
+    assert cursor == '1'
+
+    second = client.get(f'/api/stations/?limit=2&after={cursor}').get_json()
+    assert [s['_id'] for s in second['stations']] == [2, 3]
+    assert 'current_page' not in second['pagination']
+
+    last = client.get(f"/api/stations/?limit=2&after={second['pagination']['next_cursor']}").get_json()
+    assert [s['_id'] for s in last['stations']] == [4]
+    assert last['pagination']['next_cursor'] is None
+
+
+def test_first_page_includes_negative_ids(client, fake_db):
+    fake_db.waqi_stations.docs = [{'_id': i, 'station_id': i} for i in (3, -7, 1, -2)]
+    first = client.get('/api/stations/?limit=2').get_json()
+    assert [s['_id'] for s in first['stations']] == [-7, -2]
+    cursor = first['pagination']['next_cursor']
+    assert cursor == '-2'
+
+    second = client.get(f'/api/stations/?limit=2&after={cursor}').get_json()
+    assert [s['_id'] for s in second['stations']] == [1, 3]
+
+
+def test_int_cursor_keeps_object_id_stations(client, fake_db):
+    oids = sorted([ObjectId(), ObjectId()])
+    fake_db.waqi_stations.docs = [{'_id': 2}, {'_id': oids[1]}, {'_id': 1}, {'_id': oids[0]}]
+    first = client.get('/api/stations/?limit=2').get_json()
+    assert [s['_id'] for s in first['stations']] == [1, 2]
+
+    second = client.get(f"/api/stations/?limit=2&after={first['pagination']['next_cursor']}").get_json()
+    assert [s['_id'] for s in second['stations']] == [str(oid) for oid in oids]
+    assert second['pagination']['next_cursor'] is None
+
+
+def test_all_digit_object_id_cursor(client, fake_db):
+    oids = [ObjectId('1' * 24), ObjectId('2' * 24), ObjectId('3' * 24)]
+    fake_db.waqi_stations.docs = [{'_id': 5}] + [{'_id': oid} for oid in oids]
+    data = client.get(f'/api/stations/?limit=2&after={oids[0]}').get_json()
+    assert [s['_id'] for s in data['stations']] == [str(oid) for oid in oids[1:]]
+
+
+def test_after_cursor_rejects_garbage(client):
+    assert client.get('/api/stations/?after=nope').status_code == 400
+
+
+def test_invalid_limit_rejected(client):
+    resp = client.get('/api/stations/?limit=0')
+    assert resp.status_code == 400
+    assert 'limit' in resp.get_json()['error']
@@ -0,0 +1,243 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from bson import ObjectId
+from flask import Flask
+from flask_jwt_extended import JWTManager, create_access_token
+from pymongo.errors import DuplicateKeyError
+from pymongo.results import UpdateResult
+
+
+def _matches(doc, filter_doc):
+    for field, cond in filter_doc.items():
+        value = doc.get(field)
+        if isinstance(cond, dict) and '$in' in cond:
+            if value not in cond['$in']:
+                return False
+        elif isinstance(cond, dict) and '$ne' in cond:
+            if value == cond['$ne']:
+                return False
+        elif value != cond:
+            return False
+    return True
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = list(docs)
+
+    def limit(self, n):
+        self.docs = self.docs[:n]
+        return self
+
+    def __iter__(self):
+        return iter(self.docs)
+
+
+class FakeSubscriptions:
+    """Enough of a collection for the subscribe, unsubscribe and listing routes."""
+
+    def __init__(self):
+        self.docs = []
+        self.race = False
+
+    def find(self, filter_doc, projection=None):
+        return FakeCursor(d for d in self.docs if _matches(d, filter_doc))
+
+    def find_one_and_update(self, filter_doc, update, projection=None, upsert=False, return_document=None):
+        for doc in self.docs:
+            if _matches(doc, filter_doc):
+                return {'_id': doc['_id']}
+        if self.race:
+            # Another request inserted the same live subscription first
+            raise DuplicateKeyError('E11000 duplicate key error')
+        seeded = {k: v for k, v in filter_doc.items() if not isinstance(v, dict)}
+        self.docs.append({**seeded, **update['$setOnInsert']})
+        return None
+
+    def update_one(self, filter_doc, update):
+        matched = next((d for d in self.docs if _matches(d, filter_doc)), None)
+        if matched is not None:
+            matched.update(update['$set'])
+        return UpdateResult({'n': int(matched is not None)}, acknowledged=True)
+
+    def aggregate(self, pipeline):
+        docs = [dict(d) for d in self.docs]
+        for stage in pipeline:
+            (op, arg), = stage.items()
+            if op == '$match':
+                docs = [d for d in docs if _matches(d, arg)]
+            elif op == '$sort':
+                for field, direction in reversed(list(arg.items())):
+                    docs.sort(key=lambda d: d[field], reverse=direction < 0)
+            elif op == '$project':
+                # Computed fields ($dateToString) are left to the server
+                docs = [{k: v for k, v in d.items() if k == '_id' or arg.get(k) == 1} for d in docs]
+            elif op == '$group':
+                groups = {}
+                key = arg['_id']
+                for d in docs:
+                    if isinstance(key, dict):
+                        group_key = str(d[key['$toString'].lstrip('$')])
+                    else:
+                        group_key = d[key.lstrip('$')]
+                    groups.setdefault(group_key, d)
+                docs = [{'_id': group_key, 'doc': d} for group_key, d in groups.items()]
+            elif op == '$replaceRoot':
+                docs = [d['doc'] for d in docs]
+        return iter(docs)
+
+
+class FakeStations:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def find(self, filter_doc, projection=None):
+        return FakeCursor(d for d in self.docs if _matches(d, filter_doc))
+
+
+class FakeReadings:
+    def aggregate(self, pipeline):
+        return iter([])
+
+
+class FakeDB:
+    def __init__(self):
+        self.alert_subscriptions = FakeSubscriptions()
+        self.waqi_stations = FakeStations([{'station_id': 1, 'city': {'name': 'Ha Noi'}}])
+        self.waqi_station_readings = FakeReadings()
+
+
+@pytest.fixture
+def fake_db():
+    return FakeDB()
+
+
+@pytest.fixture
+def user_id():
+    return ObjectId()
+
+
+@pytest.fixture
+def client(monkeypatch, fake_db):
+    from backend.app.blueprints.api.subscriptions import routes
+
+    app = Flask(__name__)
+    app.config['JWT_SECRET_KEY'] = 'test-secret-key-with-enough-bytes'
+    JWTManager(app)
+    app.register_blueprint(routes.subscriptions_bp)
+    app.testing = True
+    monkeypatch.setattr('backend.app.db.get_db', lambda: fake_db)
+    monkeypatch.setattr(routes.users_repo, 'exists', lambda uid: True)
+    monkeypatch.setattr(routes.readings_repo, 'find_latest_by_station', lambda *a, **k: [])
+    routes._station_cache.clear()
+    routes._reading_cache.clear()
+    return app.test_client()
+
+
+@pytest.fixture
+def auth(client, user_id):
+    with client.application.app_context():
+        token = create_access_token(identity=str(user_id))
+    return {'Authorization': f'Bearer {token}'}
+
+
+def _subscribe(client, auth, **body):
+    return client.post('/api/subscriptions/subscribe', json=body, headers=auth)
+
+
+def test_subscribe_creates_subscription(client, auth, fake_db, user_id):
+    resp = _subscribe(client, auth, station_id='42', threshold=150)
+    assert resp.status_code == 201
+    doc, = fake_db.alert_subscriptions.docs
+    assert str(doc['_id']) == resp.get_json()['subscription_id']
+    assert doc['user_id'] == user_id
+    assert doc['station_id'] == 42
+    assert doc['alert_threshold'] == 150
+    assert doc['metadata']['nickname'] == 'Station 42'
+
+
+def test_duplicate_subscription_conflicts(client, auth):
+    assert _subscribe(client, auth, station_id=42).status_code == 201
+    resp = _subscribe(client, auth, station_id=42)
+    assert resp.status_code == 409
+    assert resp.get_json()['error'] == 'already subscribed to this station'
+
+
+def test_subscription_limit(client, auth, fake_db, user_id):
+    fake_db.alert_subscriptions.docs = [
+        {'_id': ObjectId(), 'user_id': user_id, 'station_id': i, 'status': 'active'}
+        for i in range(10)
+    ]
+    resp = _subscribe(client, auth, station_id=99)
+    assert resp.status_code == 400
+    assert 'limit' in resp.get_json()['error']
+
+
+def test_concurrent_upsert_conflicts(client, auth, fake_db):
+    fake_db.alert_subscriptions.race = True
+    assert _subscribe(client, auth, station_id=42).status_code == 409
+
+
+@pytest.mark.parametrize('station_id', [True, 4.5, 'abc', '1e3', [1], {'id': 1}])
+def test_invalid_station_id_rejected(client, auth, fake_db, station_id):
+    assert _subscribe(client, auth, station_id=station_id).status_code == 400
+    assert fake_db.alert_subscriptions.docs == []
+
+
+@pytest.mark.parametrize('threshold', [False, 50.5, 'high'])
+def test_invalid_threshold_rejected(client, auth, threshold):
+    assert _subscribe(client, auth, station_id=42, threshold=threshold).status_code == 400
+
+
+def test_listing_keeps_newest_subscription_per_station(client, auth, fake_db, user_id):
+    now = datetime.now(timezone.utc)
+    older, newer, other = ObjectId(), ObjectId(), ObjectId()
+    fake_db.alert_subscriptions.docs = [
+        {'_id': older, 'user_id': user_id, 'station_id': 1, 'status': 'active',
+         'createdAt': now - timedelta(days=2)},
+        {'_id': newer, 'user_id': user_id, 'station_id': 1, 'status': 'paused',
+         'createdAt': now - timedelta(days=1)},
+        {'_id': other, 'user_id': user_id, 'station_id': 2, 'status': 'active',
+         'createdAt': now - timedelta(days=3)},
+        {'_id': ObjectId(), 'user_id': user_id, 'station_id': 3, 'status': 'expired',
+         'createdAt': now},
+        {'_id': ObjectId(), 'user_id': ObjectId(), 'station_id': 4, 'status': 'active',
+         'createdAt': now},
+    ]
+    resp = client.get('/api/subscriptions', headers=auth)
+    assert resp.status_code == 200
+    rows = resp.get_json()['subscriptions']
+    assert [(row['id'], row['station_id']) for row in rows] == [(str(newer), 1), (str(other), 2)]
+    assert rows[0]['alert_enabled'] is False
+    assert rows[0]['station_name'] == 'Ha Noi'
+
+
+def test_listing_merges_legacy_string_station_ids(client, auth, fake_db, user_id):
+    now = datetime.now(timezone.utc)
+    newer = ObjectId()
+    fake_db.alert_subscriptions.docs = [
+        {'_id': ObjectId(), 'user_id': user_id, 'station_id': '1', 'status': 'active',
+         'createdAt': now - timedelta(days=2)},
+        {'_id': newer, 'user_id': user_id, 'station_id': 1, 'status': 'active',
+         'createdAt': now - timedelta(days=1)},
+    ]
+    rows = client.get('/api/subscriptions', headers=auth).get_json()['subscriptions']
+    assert [(row['id'], row['station_id']) for row in rows] == [(str(newer), 1)]
+
+
+def test_legacy_string_subscription_blocks_duplicate(client, auth, fake_db, user_id):
+    fake_db.alert_subscriptions.docs = [
+        {'_id': ObjectId(), 'user_id': user_id, 'station_id': '42', 'status': 'active'},
+    ]
+    assert _subscribe(client, auth, station_id=42).status_code == 409
+    assert len(fake_db.alert_subscriptions.docs) == 1
+
+
+def test_unsubscribe_matches_legacy_string_station_id(client, auth, fake_db, user_id):
+    fake_db.alert_subscriptions.docs = [
+        {'_id': ObjectId(), 'user_id': user_id, 'station_id': '42', 'status': 'active'},
+    ]
+    resp = client.post('/api/subscriptions/unsubscribe', json={'station_id': 42}, headers=auth)
+    assert resp.status_code == 200
+    assert fake_db.alert_subscriptions.docs[0]['status'] == 'expired'
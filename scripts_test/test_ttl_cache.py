@@ -0,0 +1,45 @@
+import backend.app.cache as cache_module
+from backend.app.cache import TTLCache
+
+
+def test_get_set_and_default():
+    cache = TTLCache(maxsize=4, ttl=60)
+    assert cache.get('a') is None
+    assert cache.get('a', 'missing') == 'missing'
+    cache.set('a', 1)
+    assert cache.get('a') == 1
+    assert len(cache) == 1
+
+
+def test_entries_expire(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, 'monotonic', lambda: now[0])
+    cache = TTLCache(maxsize=4, ttl=5)
+    cache.set('a', 1)
+    now[0] += 4.9
+    assert cache.get('a') == 1
+    now[0] += 0.2
+    assert cache.get('a') is None
+    assert len(cache) == 0
+
+
+def test_least_recently_used_is_evicted():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    # touch 'a' so 'b' becomes the eviction candidate
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+
+
+def test_pop_and_clear():
+    cache = TTLCache(maxsize=4, ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.pop('a') == 1
+    assert cache.pop('a', 'gone') == 'gone'
+    cache.clear()
+    assert len(cache) == 0
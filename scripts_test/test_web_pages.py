@@ -0,0 +1,51 @@
+"""Tests for the server-rendered web pages (pre-rendered bodies and ETags)."""
+
+from pathlib import Path
+
+import pytest
+from flask import Flask
+from flask_limiter import Limiter
+from flask_limiter.util import get_remote_address
+
+from backend.app.blueprints.web.routes import web_bp
+
+APP_ROOT = Path(__file__).resolve().parent.parent / 'backend' / 'app'
+
+
+@pytest.fixture
+def client():
+    app = Flask('backend.app', root_path=str(APP_ROOT))
+    app.testing = True
+    # The limiter inspects every view function, as in create_app()
+    Limiter(get_remote_address, app=app, storage_uri='memory://')
+    app.register_blueprint(web_bp)
+    return app.test_client()
+
+
+@pytest.mark.parametrize('path', ['/', '/login', '/subscriptions', '/subscriptions.html', '/terms', '/clear-auth'])
+def test_static_pages_revalidate_with_etag(client, path):
+    first = client.get(path)
+    assert first.status_code == 200
+    assert first.headers['Content-Length'] == str(len(first.data))
+    etag = first.headers['ETag']
+
+    again = client.get(path, headers={'If-None-Match': etag})
+    assert again.status_code == 304
+    assert again.data == b''
+
+
+def test_terms_page_is_cacheable(client):
+    assert client.get('/terms').headers['Cache-Control'] == 'public, max-age=86400'
+
+
+def test_dynamic_pages_render_request_values(client):
+    assert b'a@example.com' in client.get('/verify-code?email=a@example.com').data
+    resp = client.get('/reset-password?token=tok123')
+    assert resp.status_code == 200
+    assert b'tok123' in resp.data
+
+
+def test_aliases_redirect(client):
+    resp = client.get('/forgot')
+    assert resp.status_code == 302
+    assert resp.headers['Location'] == '/forgot-password'